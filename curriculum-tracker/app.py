@@ -8,12 +8,22 @@ import os
 from pathlib import Path
 from flask import Flask
 
-# Try to load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except (ImportError, PermissionError, OSError):
-    pass  # python-dotenv not installed or .env not accessible, use environment variables directly
+# Every variable read from the environment here and in database.py
+ENV_VARS = (
+    'SECRET_KEY', 'X_SENDFILE',
+    'POSTGRES_HOST', 'POSTGRES_DB', 'POSTGRES_USER', 'POSTGRES_PASSWORD', 'POSTGRES_PORT',
+    'POSTGRES_POOL_MIN', 'POSTGRES_POOL_MAX',
+)
+
+# Try to load environment variables from .env file (skipped when the
+# environment is already fully configured, e.g. injected by the process manager).
+# This runs before database is imported, so it covers its settings too.
+if not all(name in os.environ for name in ENV_VARS):
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except (ImportError, PermissionError, OSError):
+        pass  # python-dotenv not installed or .env not accessible, use environment variables directly
 
 # Import from new modular structure
 from database import close_db, init_db
@@ -30,6 +40,8 @@ def create_app():
     app = Flask(__name__)
     app.secret_key = os.environ.get("SECRET_KEY", "dev-secret-key")
     app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB limit
+    # Let the front-end server (nginx/Apache) stream uploaded files itself
+    app.config['USE_X_SENDFILE'] = os.environ.get("X_SENDFILE") == "1"
     
     # Configure Flask-Login
     login_manager = LoginManager()
@@ -18,14 +18,16 @@ KEEP_TAGS = [
 ]
 
 def cleanup_tags():
-    conn = sqlite3.connect(DB_PATH)
+    # Autocommit mode so the transaction below is opened explicitly
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     conn.row_factory = sqlite3.Row
     try:
-        # Get all tags
-        all_tags = conn.execute("SELECT id, name FROM tags").fetchall()
+        # Read and both deletes share one write transaction
+        conn.execute("BEGIN IMMEDIATE")
         
+        # Stream tags straight off the cursor rather than materializing them
         tags_to_delete = []
-        for tag in all_tags:
+        for tag in conn.execute("SELECT id, name FROM tags"):
             if tag["name"] not in KEEP_TAGS:
                 tags_to_delete.append(tag["id"])
                 print(f"  Will delete tag: {tag['name']}")
@@ -37,17 +39,16 @@ def cleanup_tags():
             
             # Delete tags
             conn.execute(f"DELETE FROM tags WHERE id IN ({placeholders})", tags_to_delete)
-            
-            conn.commit()
             print(f"\n✓ Deleted {len(tags_to_delete)} junk tags")
         else:
             print("✓ No junk tags found")
         
         # Show remaining tags
         remaining = conn.execute("SELECT name FROM tags ORDER BY name").fetchall()
+        conn.execute("COMMIT")
         print(f"\n✓ Remaining tags ({len(remaining)}): {[t['name'] for t in remaining]}")
-        
     finally:
+        # Closing without COMMIT rolls the whole transaction back
         conn.close()
 
 if __name__ == "__main__":
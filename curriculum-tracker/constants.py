@@ -38,6 +38,9 @@ RESOURCE_TYPES = [
     'Lab', 'Tutorial', 'Action', 'Note', 'Deliverable', 'Link'
 ]
 
+# Stored resource_type values are the lowercase type names
+VALID_RESOURCE_TYPES = frozenset(t.lower() for t in RESOURCE_TYPES)
+
 # Mood options for journal
 MOOD_OPTIONS = {
     'great': '😊',
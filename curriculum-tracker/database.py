@@ -4,18 +4,14 @@ Database connection and initialization module for Curriculum Tracker.
 Handles PostgreSQL connections, migrations, and schema setup.
 """
 
+import atexit
 import os
+import threading
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from psycopg2.pool import ThreadedConnectionPool
 from flask import g
 
-# Try to load environment variables from .env file
-try:
-    from dotenv import load_dotenv
-    load_dotenv()
-except (ImportError, PermissionError, OSError):
-    pass  # python-dotenv not installed or .env not accessible, use environment variables directly
-
 # Database configuration
 DB_CONFIG = {
     'host': os.getenv('POSTGRES_HOST', 'localhost'),
@@ -25,29 +21,63 @@ DB_CONFIG = {
     'port': os.getenv('POSTGRES_PORT', '5432')
 }
 
+# Connection pool sizing (maxconn caps the connections each worker process holds)
+POOL_MIN = int(os.getenv('POSTGRES_POOL_MIN', '2'))
+POOL_MAX = int(os.getenv('POSTGRES_POOL_MAX', '20'))
+
+# Connection pool shared by request threads (created lazily on first use so
+# importing this module never opens a connection)
+_pool = None
+_pool_lock = threading.Lock()
+# One slot per pooled connection: ThreadedConnectionPool raises PoolError
+# when exhausted, so requests past the cap wait here for a slot instead
+_pool_slots = threading.BoundedSemaphore(POOL_MAX)
+
+
+def get_pool():
+    """Get the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ThreadedConnectionPool(POOL_MIN, POOL_MAX, **DB_CONFIG)
+                atexit.register(_pool.closeall)
+    return _pool
+
 
 def get_db():
     """Get database connection using Flask's g object for automatic cleanup."""
     if 'db' not in g:
-        g.db = psycopg2.connect(**DB_CONFIG)
+        _pool_slots.acquire()
+        try:
+            g.db = get_pool().getconn()
+        except Exception:
+            _pool_slots.release()
+            raise
     return g.db
 
 
-def get_db_cursor(conn):
-    """Get cursor that returns rows as dictionaries."""
-    return conn.cursor(cursor_factory=RealDictCursor)
+def get_db_cursor(conn, name=None):
+    """Get cursor that returns rows as dictionaries (server-side if named)."""
+    return conn.cursor(name=name, cursor_factory=RealDictCursor)
 
 
 def close_db(exception):
-    """Automatically close database connection and cursors at end of request."""
+    """Return the request's connection to the pool at end of request."""
     db = g.pop('db', None)
     if db is not None:
-        # Close any open cursors
-        if hasattr(db, 'cursors'):
-            for cursor in db.cursors:
-                if not cursor.closed:
-                    cursor.close()
-        db.close()
+        # Discard any uncommitted work so the next request starts clean
+        broken = bool(db.closed)
+        if not broken:
+            try:
+                db.rollback()
+            except psycopg2.Error:
+                broken = True
+        # Broken connections are closed rather than handed back out
+        try:
+            get_pool().putconn(db, close=broken)
+        finally:
+            _pool_slots.release()
 
 
 
@@ -98,8 +128,8 @@ def init_db():
         "CREATE TABLE IF NOT EXISTS blocked_days (id SERIAL PRIMARY KEY, date DATE NOT NULL UNIQUE, reason TEXT, created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP)"
     ]
     
-    for statement in create_statements:
-        cur.execute(statement)
+    # Send all DDL in one round-trip (psycopg2 accepts multiple statements)
+    cur.execute(";\n".join(create_statements))
     
     cur.close()
     conn.commit()
@@ -13,12 +13,33 @@ CSV COLUMN MAPPING:
 import csv
 import re
 import sqlite3
+from operator import itemgetter
 from pathlib import Path
 from urllib.parse import urlparse
 
 DB_PATH = Path(__file__).parent / "tracker.db"
 CSV_PATH = Path(__file__).parent / "curriculum_data.csv"
 
+# Columns read from the CSV, in the order import_csv unpacks them
+CSV_COLUMNS = (
+    "Focus",
+    "Week",
+    "Day",
+    "Resource Link",
+    "Resource Type",
+    "Specific Tasks / Context",
+    "Why this resource?",
+    "Recommended Resource",
+)
+
+# WAL + relaxed sync for bulk loading: row writes become coalesced WAL appends
+BULK_PRAGMAS = """
+    PRAGMA journal_mode=WAL;
+    PRAGMA synchronous=NORMAL;
+    PRAGMA temp_store=MEMORY;
+    PRAGMA cache_size=-65536;
+"""
+
 TYPE_MAP = {
     "course": "course",
     "course (free)": "course",
@@ -33,29 +54,57 @@ TYPE_MAP = {
     "review": "note",
 }
 
+_TYPE_SPLIT = re.compile(r"[\\/|,]")
+_WEEK_RE = re.compile(r"w(\d+)")
+_WWW_RE = re.compile(r'^www\.', re.IGNORECASE)
+_TLD_RE = re.compile(r'\.(com|org|net|io|ai|edu)$', re.IGNORECASE)
+
+def row_picker(header):
+    """Build a function returning a row's CSV_COLUMNS values, stripped."""
+    width = len(header)
+    # Missing columns point at an empty cell appended just past the header
+    pick = itemgetter(*(header.index(name) if name in header else width for name in CSV_COLUMNS))
+
+    def picker(row):
+        # Pad or truncate to the header first, so overflow cells on long rows
+        # never land in the missing-column slot
+        row = row[:width]
+        row += [""] * (width + 1 - len(row))
+        return tuple(c.strip() for c in pick(row))
+
+    return picker
+
 def normalize_type(raw: str) -> str:
     if not raw:
         return "note"
     raw = raw.strip().lower()
     # Mixed types like "Docs/Course" -> take first token
-    first = re.split(r"[\\/|,]", raw)[0].strip()
+    first = _TYPE_SPLIT.split(raw)[0].strip()
     return TYPE_MAP.get(first, "note")
 
+# Absolute week -> (phase_index, week within phase) for the 17-week curriculum
+_WEEK_TABLE = {
+    w: (0, w) if w <= 4 else (1, w - 4) if w <= 8 else (2, w - 8) if w <= 12 else (3, w - 12)
+    for w in range(1, 18)
+}
+
 def week_to_phase_and_rel(week_label: str):
     # week_label like 'W1', 'W10'
-    m = re.match(r"w(\d+)", week_label.strip().lower())
+    m = _WEEK_RE.match(week_label.strip().lower())
     if not m:
         return None, None
-    w = int(m.group(1))
-    if 1 <= w <= 4:
-        return 0, w
-    if 5 <= w <= 8:
-        return 1, w - 4
-    if 9 <= w <= 12:
-        return 2, w - 8
-    if 13 <= w <= 17:
-        return 3, w - 12
-    return None, None
+    return _WEEK_TABLE.get(int(m.group(1)), (None, None))
+
+# Display names for domains that don't capitalize cleanly
+_DOMAIN_NAMES = {
+    'udemy': 'Udemy',
+    'codecademy': 'Codecademy',
+    'deeplearning': 'DeepLearning.ai',
+    'supabase': 'Supabase',
+    'github': 'GitHub',
+    'youtube': 'YouTube',
+    'mdn': 'MDN',
+}
 
 def extract_domain(url):
     """Extract domain from URL and return a normalized tag name."""
@@ -65,52 +114,31 @@ def extract_domain(url):
         parsed = urlparse(url)
         domain = parsed.netloc or parsed.path
         # Remove www. prefix
-        domain = re.sub(r'^www\.', '', domain, flags=re.IGNORECASE)
+        domain = _WWW_RE.sub('', domain)
         # Remove common TLDs for cleaner names
-        domain = re.sub(r'\.(com|org|net|io|ai|edu)$', '', domain, flags=re.IGNORECASE)
+        domain = _TLD_RE.sub('', domain)
         # Capitalize properly
-        if domain == 'udemy':
-            return 'Udemy'
-        elif domain == 'codecademy':
-            return 'Codecademy'
-        elif domain == 'deeplearning':
-            return 'DeepLearning.ai'
-        elif domain == 'supabase':
-            return 'Supabase'
-        elif domain == 'github':
-            return 'GitHub'
-        elif domain == 'youtube':
-            return 'YouTube'
-        elif domain == 'mdn':
-            return 'MDN'
-        else:
-            # Capitalize first letter
-            return domain.capitalize() if domain else None
+        return _DOMAIN_NAMES.get(domain) or (domain.capitalize() if domain else None)
     except:
         return None
 
 
-def get_or_create_tag(conn, name, color):
+def get_or_create_tag(cur, name, color):
     """Get or create a tag, return its ID."""
-    cur = conn.execute("SELECT id FROM tags WHERE name = ?", (name,))
-    row = cur.fetchone()
-    if row:
-        return row[0]
-    cur = conn.execute("INSERT INTO tags (name, color) VALUES (?, ?)", (name, color))
-    return cur.lastrowid
+    # No-op update on conflict so RETURNING yields the existing row's id
+    cur.execute(
+        "INSERT INTO tags (name, color) VALUES (?, ?) ON CONFLICT(name) DO UPDATE SET name = excluded.name RETURNING id",
+        (name, color)
+    )
+    return cur.fetchone()[0]
 
 
-def link_tag_to_resource(conn, resource_id, tag_id):
+def link_tag_to_resource(cur, resource_id, tag_id):
     """Link a tag to a resource if not already linked."""
-    cur = conn.execute(
-        "SELECT 1 FROM resource_tags WHERE resource_id = ? AND tag_id = ?",
+    cur.execute(
+        "INSERT OR IGNORE INTO resource_tags (resource_id, tag_id) VALUES (?, ?)",
         (resource_id, tag_id)
     )
-    if not cur.fetchone():
-        conn.execute(
-            "INSERT INTO resource_tags (resource_id, tag_id) VALUES (?, ?)",
-            (resource_id, tag_id)
-        )
 
 
 TYPE_COLORS = {
@@ -136,37 +164,38 @@ SOURCE_COLORS = {
 }
 
 
-def upsert_resource(conn, phase_index, week, day, title, topic, url, resource_type, notes):
+def upsert_resource(cur, existing, tag_ids, links, updates, phase_index, week, day, title, topic, url, resource_type, notes):
     # Match on (phase_index, week, day, title) for updates
     # Only update resources where source='curriculum' AND user_modified=0
-    existing = conn.execute(
-        "SELECT id, source, user_modified FROM resources WHERE phase_index = ? AND week = ? AND day = ? AND title = ?",
-        (phase_index, week, day, title),
-    ).fetchone()
+    # existing/tag_ids/links are preloaded lookups; updates are queued for one executemany
+    key = (phase_index, week, day, title)
+    match = existing.get(key)
     
-    if existing:
+    if match:
         # Only update if source is 'curriculum' AND not user-modified
-        if existing[1] == 'curriculum' and not existing[2]:
-            conn.execute(
-                "UPDATE resources SET url = ?, resource_type = ?, notes = ?, topic = ? WHERE id = ?",
-                (url or None, resource_type, notes or None, topic or None, existing[0]),
-            )
-            resource_id = existing[0]
+        if match[1] == 'curriculum' and not match[2]:
+            updates.append((url or None, resource_type, notes or None, topic or None, match[0]))
+            resource_id = match[0]
         else:
             # Skip updating user-modified or user-added resources
-            return existing[0]
+            return match[0]
     else:
-        cur = conn.execute(
+        cur.execute(
             "INSERT INTO resources (phase_index, week, day, title, topic, url, resource_type, notes, source) VALUES (?, ?, ?, ?, ?, ?, ?, ?, 'curriculum')",
             (phase_index, week, day, title, topic or None, url or None, resource_type, notes or None),
         )
         resource_id = cur.lastrowid
+        existing[key] = (resource_id, 'curriculum', 0)
     
     # Auto-tag: resource_type tag ONLY (no URL-based tags)
     type_tag_name = resource_type.capitalize() if resource_type else "Note"
-    type_color = TYPE_COLORS.get(resource_type, "#6b7280")
-    type_tag_id = get_or_create_tag(conn, type_tag_name, type_color)
-    link_tag_to_resource(conn, resource_id, type_tag_id)
+    type_tag_id = tag_ids.get(type_tag_name)
+    if type_tag_id is None:
+        type_color = TYPE_COLORS.get(resource_type, "#6b7280")
+        type_tag_id = tag_ids[type_tag_name] = get_or_create_tag(cur, type_tag_name, type_color)
+    if (resource_id, type_tag_id) not in links:
+        link_tag_to_resource(cur, resource_id, type_tag_id)
+        links.add((resource_id, type_tag_id))
     
     # NOTE: URL-based tagging disabled - creates too many junk tags
     # Only resource-type tags (Course, Docs, Article, etc.) are created
@@ -176,6 +205,7 @@ def upsert_resource(conn, phase_index, week, day, title, topic, url, resource_ty
 def init_db():
     """Initialize database schema if needed."""
     conn = sqlite3.connect(DB_PATH)
+    conn.executescript(BULK_PRAGMAS)
     conn.executescript(
         """
         CREATE TABLE IF NOT EXISTS config (key TEXT PRIMARY KEY, value TEXT);
@@ -184,6 +214,7 @@ def init_db():
         CREATE TABLE IF NOT EXISTS resources (id INTEGER PRIMARY KEY AUTOINCREMENT, phase_index INTEGER, week INTEGER, day INTEGER, title TEXT NOT NULL, url TEXT, resource_type TEXT DEFAULT 'link', notes TEXT, is_completed INTEGER DEFAULT 0, is_favorite INTEGER DEFAULT 0, created_at TEXT DEFAULT CURRENT_TIMESTAMP, source TEXT DEFAULT 'user', topic TEXT);
         CREATE TABLE IF NOT EXISTS tags (id INTEGER PRIMARY KEY AUTOINCREMENT, name TEXT UNIQUE NOT NULL, color TEXT DEFAULT '#6366f1');
         CREATE TABLE IF NOT EXISTS resource_tags (resource_id INTEGER, tag_id INTEGER, PRIMARY KEY (resource_id, tag_id));
+        CREATE INDEX IF NOT EXISTS idx_resources_pwdt ON resources (phase_index, week, day, title);
         """
     )
     conn.commit()
@@ -193,51 +224,68 @@ def import_csv():
     # Ensure database schema exists
     init_db()
     
-    conn = sqlite3.connect(DB_PATH)
+    # Autocommit mode so the whole import runs in one explicit transaction
+    conn = sqlite3.connect(DB_PATH, isolation_level=None)
     try:
+        conn.executescript(BULK_PRAGMAS)
+        conn.execute("BEGIN")
+        # One cursor shared by every statement in the import
+        cur = conn.cursor()
+        # Preload lookups so each row avoids its own SELECTs
+        existing = {
+            (row[1], row[2], row[3], row[4]): (row[0], row[5], row[6])
+            for row in cur.execute(
+                "SELECT id, phase_index, week, day, title, source, user_modified FROM resources"
+            )
+        }
+        tag_ids = {name: tag_id for tag_id, name in cur.execute("SELECT id, name FROM tags")}
+        links = set(cur.execute("SELECT resource_id, tag_id FROM resource_tags"))
+        updates = []
         with open(CSV_PATH, newline='', encoding='utf-8') as f:
-            reader = csv.DictReader(f)
-            rows = list(reader)
-        for r in rows:
-            focus = (r.get("Focus") or "").strip()
-            week_label = (r.get("Week") or "").strip()
-            day_str = (r.get("Day") or "").strip()
-            res_link = (r.get("Resource Link") or "").strip()
-            res_type_raw = (r.get("Resource Type") or "").strip()
-            spec = (r.get("Specific Tasks / Context") or "").strip()
-            why = (r.get("Why this resource?") or "").strip()
-            rec = (r.get("Recommended Resource") or "").strip()
-
-            if not focus or not week_label or not day_str:
-                # skip incomplete rows
-                continue
-
-            phase_index, rel_week = week_to_phase_and_rel(week_label)
-            try:
-                day = int(day_str)
-            except ValueError:
-                continue
-            if phase_index is None or rel_week is None or not (1 <= day <= 6):
-                continue
-
-            # title = "Recommended Resource" column (actual course/doc name)
-            title = rec if rec else focus  # Fallback to focus if no recommended resource
-            # topic = "Focus" column (the topic like "API Authentication")
-            topic = focus
-            url = res_link
-            resource_type = normalize_type(res_type_raw)
-            # Notes: "Tasks: {specific_tasks}" and "Why: {why_this_resource}"
-            notes_parts = []
-            if spec:
-                notes_parts.append(f"Tasks: {spec}")
-            if why:
-                notes_parts.append(f"Why: {why}")
-            notes = " | ".join(notes_parts) if notes_parts else None
-
-            upsert_resource(conn, phase_index, rel_week, day, title, topic, url, resource_type, notes)
-        conn.commit()
-        print(f"Imported {len(rows)} rows from {CSV_PATH.name} (skipped invalid).")
+            reader = csv.reader(f)
+            pick = row_picker(next(reader, []))
+            count = 0
+            # Iterate lazily so parsing overlaps with the writes
+            for r in reader:
+                focus, week_label, day_str, res_link, res_type_raw, spec, why, rec = pick(r)
+
+                if not focus or not week_label or not day_str:
+                    # skip incomplete rows
+                    continue
+
+                phase_index, rel_week = week_to_phase_and_rel(week_label)
+                try:
+                    day = int(day_str)
+                except ValueError:
+                    continue
+                if phase_index is None or rel_week is None or not (1 <= day <= 6):
+                    continue
+
+                # title = "Recommended Resource" column (actual course/doc name)
+                title = rec if rec else focus  # Fallback to focus if no recommended resource
+                # topic = "Focus" column (the topic like "API Authentication")
+                topic = focus
+                url = res_link
+                resource_type = normalize_type(res_type_raw)
+                # Notes: "Tasks: {specific_tasks}" and "Why: {why_this_resource}"
+                notes_parts = []
+                if spec:
+                    notes_parts.append(f"Tasks: {spec}")
+                if why:
+                    notes_parts.append(f"Why: {why}")
+                notes = " | ".join(notes_parts) if notes_parts else None
+
+                upsert_resource(cur, existing, tag_ids, links, updates, phase_index, rel_week, day, title, topic, url, resource_type, notes)
+                count += 1
+        if updates:
+            cur.executemany(
+                "UPDATE resources SET url = ?, resource_type = ?, notes = ?, topic = ? WHERE id = ?",
+                updates,
+            )
+        conn.execute("COMMIT")
+        print(f"Imported {count} rows from {CSV_PATH.name} (skipped invalid).")
     finally:
+        # Closing without COMMIT rolls the whole import back
         conn.close()
 
 if __name__ == "__main__":
@@ -0,0 +1,44 @@
+"""add_query_indexes
+
+Revision ID: 63eacd507b35
+Revises: create_curriculum_structure
+Create Date: 2026-10-16 09:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '63eacd507b35'
+down_revision: Union[str, Sequence[str], None] = 'create_curriculum_structure'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - index the hot per-user lookups."""
+    # Date-range sums (week hours, streaks, recent logs)
+    op.create_index('ix_time_logs_user_date', 'time_logs', ['user_id', 'date'])
+
+    # Completed metrics per phase
+    op.create_index('ix_completed_metrics_user_phase', 'completed_metrics', ['user_id', 'phase_index'])
+
+    # Resources per phase (dashboard, resources page)
+    op.create_index('ix_resources_user_phase', 'resources', ['user_id', 'phase_index'])
+
+    # Tag -> resources lookups (primary key only covers resource_id first)
+    op.create_index('ix_resource_tags_tag_id', 'resource_tags', ['tag_id'])
+
+    # Refresh planner statistics so the new indexes are considered
+    op.execute("ANALYZE time_logs, completed_metrics, resources, resource_tags;")
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop query indexes."""
+    op.drop_index('ix_resource_tags_tag_id', 'resource_tags')
+    op.drop_index('ix_resources_user_phase', 'resources')
+    op.drop_index('ix_completed_metrics_user_phase', 'completed_metrics')
+    op.drop_index('ix_time_logs_user_date', 'time_logs')
@@ -0,0 +1,43 @@
+"""add_compound_query_indexes
+
+Revision ID: b41d7c2e9f10
+Revises: 63eacd507b35
+Create Date: 2026-10-16 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b41d7c2e9f10'
+down_revision: Union[str, Sequence[str], None] = '63eacd507b35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - compound indexes for week/day and phase lookups."""
+    # Week view, completion rollups and day lookups filter on all four columns;
+    # the leading (user_id, phase_index) prefix also serves per-phase queries
+    op.create_index('ix_resources_user_phase_week_day', 'resources', ['user_id', 'phase_index', 'week', 'day'])
+    op.drop_index('ix_resources_user_phase', 'resources')
+
+    # Hours grouped by phase
+    op.create_index('ix_time_logs_user_phase', 'time_logs', ['user_id', 'phase_index'])
+
+    # Overdue and calendar lookups by scheduled date
+    op.create_index('ix_resources_user_scheduled_date', 'resources', ['user_id', 'scheduled_date'])
+
+    # Refresh planner statistics so the new indexes are considered
+    op.execute("ANALYZE resources, time_logs;")
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore the single phase index."""
+    op.drop_index('ix_resources_user_scheduled_date', 'resources')
+    op.drop_index('ix_time_logs_user_phase', 'time_logs')
+    op.create_index('ix_resources_user_phase', 'resources', ['user_id', 'phase_index'])
+    op.drop_index('ix_resources_user_phase_week_day', 'resources')
@@ -0,0 +1,69 @@
+"""add_phase_hours_rollup
+
+Revision ID: c7e2a9d4b813
+Revises: b41d7c2e9f10
+Create Date: 2026-10-16 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c7e2a9d4b813'
+down_revision: Union[str, Sequence[str], None] = 'b41d7c2e9f10'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - per-user phase hours rollup kept in sync by a trigger."""
+    op.create_table(
+        'phase_hours',
+        sa.Column('user_id', sa.Integer(), sa.ForeignKey('users.id', ondelete='CASCADE'), nullable=False),
+        sa.Column('phase_index', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False, server_default='0'),
+        sa.PrimaryKeyConstraint('user_id', 'phase_index'),
+    )
+
+    # Apply each time_logs change as a delta: remove the old row's hours,
+    # add the new row's hours (rows without a phase are not rolled up)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION time_logs_phase_hours() RETURNS trigger AS $$
+        BEGIN
+            IF TG_OP IN ('UPDATE', 'DELETE') AND OLD.phase_index IS NOT NULL THEN
+                UPDATE phase_hours SET total = total - OLD.hours
+                WHERE user_id = OLD.user_id AND phase_index = OLD.phase_index;
+            END IF;
+            IF TG_OP IN ('INSERT', 'UPDATE') AND NEW.phase_index IS NOT NULL THEN
+                INSERT INTO phase_hours (user_id, phase_index, total)
+                VALUES (NEW.user_id, NEW.phase_index, NEW.hours)
+                ON CONFLICT (user_id, phase_index) DO UPDATE SET total = phase_hours.total + EXCLUDED.total;
+            END IF;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER time_logs_phase_hours
+        AFTER INSERT OR DELETE OR UPDATE OF user_id, phase_index, hours ON time_logs
+        FOR EACH ROW EXECUTE PROCEDURE time_logs_phase_hours();
+    """)
+
+    # Backfill from existing logs
+    op.execute("""
+        INSERT INTO phase_hours (user_id, phase_index, total)
+        SELECT user_id, phase_index, SUM(hours)
+        FROM time_logs
+        WHERE phase_index IS NOT NULL
+        GROUP BY user_id, phase_index
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema - drop the phase hours rollup."""
+    op.execute("DROP TRIGGER IF EXISTS time_logs_phase_hours ON time_logs;")
+    op.execute("DROP FUNCTION IF EXISTS time_logs_phase_hours();")
+    op.drop_table('phase_hours')
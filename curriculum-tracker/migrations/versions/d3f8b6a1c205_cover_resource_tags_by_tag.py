@@ -0,0 +1,32 @@
+"""cover_resource_tags_by_tag
+
+Revision ID: d3f8b6a1c205
+Revises: c7e2a9d4b813
+Create Date: 2026-10-16 17:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd3f8b6a1c205'
+down_revision: Union[str, Sequence[str], None] = 'c7e2a9d4b813'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema - reverse (tag_id, resource_id) index on resource_tags."""
+    # Covers the tag-filter EXISTS probe with an index-only scan; supersedes
+    # the tag_id-only index
+    op.create_index('ix_resource_tags_tag_resource', 'resource_tags', ['tag_id', 'resource_id'])
+    op.drop_index('ix_resource_tags_tag_id', 'resource_tags')
+
+
+def downgrade() -> None:
+    """Downgrade schema - restore the tag_id-only index."""
+    op.create_index('ix_resource_tags_tag_id', 'resource_tags', ['tag_id'])
+    op.drop_index('ix_resource_tags_tag_resource', 'resource_tags')
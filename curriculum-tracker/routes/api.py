@@ -5,11 +5,12 @@ JSON API endpoints and form handling routes.
 """
 
 import psycopg2
-import uuid
-from datetime import datetime
+import secrets
+from datetime import date, datetime
 from flask import Blueprint, request, redirect, url_for, flash, jsonify
 from flask_login import login_required, current_user
-from constants import STATUS_CYCLE
+from psycopg2.extras import execute_values
+from constants import STATUS_CYCLE, VALID_RESOURCE_TYPES, VALID_STATUSES
 
 # Import from new modular structure
 from database import get_db, get_db_cursor
@@ -27,6 +28,10 @@ from services.structure import (
 # Create blueprint
 api_bp = Blueprint('api', __name__)
 
+# Columns api_update_resource may change, in the order its UPDATE sets them
+RESOURCE_UPDATE_FIELDS = ('title', 'url', 'resource_type', 'notes', 'estimated_minutes', 'difficulty')
+ALLOWED_FIELDS = frozenset(RESOURCE_UPDATE_FIELDS)
+
 
 @api_bp.route("/log", methods=["POST"])
 @login_required
@@ -39,12 +44,12 @@ def log_hours():
         flash("Oops, invalid hours value", "error")
         return redirect(url_for("main.dashboard"))
     
-    log_date = request.form.get("date", datetime.now().strftime("%Y-%m-%d"))
+    log_date = request.form.get("date", date.today().isoformat())
     notes = request.form.get("notes", "").strip()
     
     # Validate date format
     try:
-        datetime.strptime(log_date, "%Y-%m-%d")
+        log_date = date.fromisoformat(log_date).isoformat()
     except ValueError:
         flash("Oops, invalid date format", "error")
         return redirect(url_for("main.dashboard"))
@@ -63,25 +68,22 @@ def log_hours():
         flash("Hours must be between 0.25 and 24.", "error")
         return redirect(url_for("main.dashboard"))
     
-    # Get current phase_index for this log entry
-    progress = get_progress()
-    current_phase = progress['current_phase']
-    
     conn = get_db()
     cur = get_db_cursor(conn)
-    # Insert new log entry with week, day, and resource_id if provided
+    # Insert new log entry with week, day, and resource_id if provided; the
+    # current phase is read inside the INSERT rather than in a separate query
     cur.execute(
-        "INSERT INTO time_logs (user_id, date, hours, notes, phase_index, week, day, resource_id) VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
-        (current_user.id, log_date, hours, notes, current_phase, week, day, resource_id)
+        "INSERT INTO time_logs (user_id, date, hours, notes, phase_index, week, day, resource_id) VALUES (%s, %s, %s, %s, COALESCE((SELECT current_phase FROM progress WHERE user_id = %s), 0), %s, %s, %s)",
+        (current_user.id, log_date, hours, notes, current_user.id, week, day, resource_id)
     )
     cur.close()
-    conn.commit()
     
-    # Log activity
+    # Log activity in the same transaction
     details = f"{hours}h on {log_date}"
     if notes:
         details += f": {notes[:50]}"
-    log_activity("hours_logged", "time_log", None, details)
+    log_activity("hours_logged", "time_log", None, details, commit=False)
+    conn.commit()
     
     flash(f"Locked in {hours} hours!", "success")
     return redirect(url_for("main.dashboard"))
@@ -105,12 +107,12 @@ def complete_metric():
     conn = get_db()
     cur = get_db_cursor(conn)
     cur.execute("INSERT INTO completed_metrics (user_id, phase_index, metric_text, completed_date) VALUES (%s, %s, %s, %s) ON CONFLICT (phase_index, metric_text) DO NOTHING",
-        (current_user.id, phase_index, metric_text, datetime.now().strftime("%Y-%m-%d")))
+        (current_user.id, phase_index, metric_text, date.today().isoformat()))
     cur.close()
-    conn.commit()
     
-    # Log activity
-    log_activity("metric_completed", "metric", phase_index, metric_text[:100])
+    # Log activity in the same transaction
+    log_activity("metric_completed", "metric", phase_index, metric_text[:100], commit=False)
+    conn.commit()
     
     return redirect(url_for("main.dashboard"))
 
@@ -140,7 +142,8 @@ def uncomplete_metric():
 @api_bp.route("/next-week", methods=["POST"])
 def next_week():
     curriculum = load_curriculum()
-    progress = get_progress()
+    # Lock the row so two quick clicks can't both advance from the same week
+    progress = get_progress(for_update=True)
     current_phase = progress['current_phase']
     current_week = progress['current_week']
     if current_phase >= len(curriculum["phases"]):
@@ -156,7 +159,7 @@ def next_week():
 @api_bp.route("/prev-week", methods=["POST"])
 def prev_week():
     curriculum = load_curriculum()
-    progress = get_progress()
+    progress = get_progress(for_update=True)
     current_phase = progress['current_phase']
     current_week = progress['current_week']
     if current_week > 1:
@@ -221,8 +224,8 @@ def api_week_content():
     grouped_week, ungrouped_week = get_resources_by_week(phase_index, week)
     
     return jsonify({
-        "grouped": {str(k): [dict(r) for r in v] for k, v in grouped_week.items()},
-        "ungrouped": [dict(r) for r in ungrouped_week]
+        "grouped": {str(k): v for k, v in grouped_week.items()},
+        "ungrouped": ungrouped_week
     })
 
 
@@ -322,6 +325,18 @@ def add_resource():
     return redirect(request.referrer or url_for("main.dashboard"))
 
 
+def _milestone_metric(curriculum, phase_index, week):
+    """Get the metric a milestone resource completes, or None."""
+    if phase_index is None or week is None or phase_index >= len(curriculum["phases"]):
+        return None
+    metrics = curriculum["phases"][phase_index].get("metrics", [])
+    # Map week to metric index: Week 1 → metrics[0], Week 2 → metrics[1], etc.
+    metric_index = week - 1  # week is 1-indexed, metrics are 0-indexed
+    if 0 <= metric_index < len(metrics):
+        return metrics[metric_index]
+    return None
+
+
 @api_bp.route("/toggle-resource/<int:resource_id>", methods=["POST"])
 @login_required
 def toggle_resource(resource_id):
@@ -332,8 +347,9 @@ def toggle_resource(resource_id):
     
     conn = get_db()
     cur = get_db_cursor(conn)
-    # Get current state and resource details including is_milestone
-    cur.execute("SELECT phase_index, week, day, status, is_milestone FROM resources WHERE user_id = %s AND id = %s", (current_user.id, resource_id))
+    # Get current state and resource details including is_milestone; the row
+    # lock holds off a concurrent toggle until this transaction commits
+    cur.execute("SELECT phase_index, week, day, status, is_milestone FROM resources WHERE user_id = %s AND id = %s FOR UPDATE", (current_user.id, resource_id))
     resource = cur.fetchone()
     if not resource:
         cur.close()
@@ -362,39 +378,33 @@ def toggle_resource(resource_id):
         )
     
     # If this is a milestone resource, link to metrics based on new status
-    if is_milestone and phase_index is not None and week is not None:
-        curriculum = load_curriculum()
-        if phase_index < len(curriculum["phases"]):
-            phase = curriculum["phases"][phase_index]
-            metrics = phase.get("metrics", [])
-            # Map week to metric index: Week 1 → metrics[0], Week 2 → metrics[1], etc.
-            metric_index = week - 1  # week is 1-indexed, metrics are 0-indexed
-            if 0 <= metric_index < len(metrics):
-                metric_text = metrics[metric_index]
-                
-                if new_status == "complete":
-                    # Auto-complete the metric and store the resource_id that triggered it
-                    cur.execute(
-                        "INSERT INTO completed_metrics (user_id, phase_index, metric_text, completed_date, resource_id) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (phase_index, metric_text) DO NOTHING",
-                        (current_user.id, phase_index, metric_text, datetime.now().strftime("%Y-%m-%d"), resource_id)
-                    )
-                else:
-                    # Auto-delete the metric if not complete
-                    cur.execute(
-                        "DELETE FROM completed_metrics WHERE user_id = %s AND phase_index = %s AND metric_text = %s",
-                        (current_user.id, phase_index, metric_text)
-                    )
+    if is_milestone:
+        metric_text = _milestone_metric(load_curriculum(), phase_index, week)
+        if metric_text is not None:
+            if new_status == "complete":
+                # Auto-complete the metric and store the resource_id that triggered it
+                cur.execute(
+                    "INSERT INTO completed_metrics (user_id, phase_index, metric_text, completed_date, resource_id) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (phase_index, metric_text) DO NOTHING",
+                    (current_user.id, phase_index, metric_text, date.today().isoformat(), resource_id)
+                )
+            else:
+                # Auto-delete the metric if not complete
+                cur.execute(
+                    "DELETE FROM completed_metrics WHERE user_id = %s AND phase_index = %s AND metric_text = %s",
+                    (current_user.id, phase_index, metric_text)
+                )
     
     cur.close()
-    conn.commit()
     
-    # Log the activity
+    # Log the activity in the same transaction
     log_activity(
         f"resource_{new_status}",
         "resource",
         resource_id,
-        f"Phase {phase_index + 1} Week {week} Day {day}"
+        f"Phase {phase_index + 1} Week {week} Day {day}",
+        commit=False
     )
+    conn.commit()
     
     # Build redirect URL with preserved query parameters
     redirect_url = request.referrer or url_for("main.dashboard")
@@ -411,6 +421,64 @@ def toggle_resource(resource_id):
     return redirect(redirect_url)
 
 
+@api_bp.route("/batch-status", methods=["POST"])
+@login_required
+def batch_status():
+    """Set the status of several resources at once (ids=1,2,3&status=complete)."""
+    new_status = request.form.get("status", "")
+    if new_status not in VALID_STATUSES:
+        flash("Oops, invalid status", "error")
+        return redirect(request.referrer or url_for("main.dashboard"))
+    try:
+        resource_ids = [int(rid) for rid in request.form.get("ids", "").split(",") if rid.strip()]
+    except ValueError:
+        flash("Oops, invalid resource ids", "error")
+        return redirect(request.referrer or url_for("main.dashboard"))
+    if not resource_ids:
+        flash("No resources selected", "error")
+        return redirect(request.referrer or url_for("main.dashboard"))
+    
+    is_complete = new_status == "complete"
+    conn = get_db()
+    cur = get_db_cursor(conn)
+    # One UPDATE for the whole selection
+    cur.execute("""
+        UPDATE resources
+        SET status = %s, is_completed = %s,
+            completed_at = CASE WHEN %s THEN COALESCE(completed_at, %s) ELSE NULL END
+        WHERE user_id = %s AND id = ANY(%s)
+        RETURNING id, phase_index, week, is_milestone
+    """, (new_status, is_complete, is_complete, datetime.now().isoformat(), current_user.id, resource_ids))
+    updated = cur.fetchall()
+    
+    # Keep milestone-linked metrics in step, as toggle_resource does
+    milestones = [r for r in updated if r["is_milestone"]]
+    if milestones:
+        curriculum = load_curriculum()
+        today = date.today().isoformat()
+        for r in milestones:
+            metric_text = _milestone_metric(curriculum, r["phase_index"], r["week"])
+            if metric_text is None:
+                continue
+            if is_complete:
+                cur.execute(
+                    "INSERT INTO completed_metrics (user_id, phase_index, metric_text, completed_date, resource_id) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (phase_index, metric_text) DO NOTHING",
+                    (current_user.id, r["phase_index"], metric_text, today, r["id"])
+                )
+            else:
+                cur.execute(
+                    "DELETE FROM completed_metrics WHERE user_id = %s AND phase_index = %s AND metric_text = %s",
+                    (current_user.id, r["phase_index"], metric_text)
+                )
+    
+    cur.close()
+    
+    log_activity(f"resources_{new_status}", "resource", None, f"{len(updated)} resources", commit=False)
+    conn.commit()
+    flash(f"Updated {len(updated)} resources.", "success")
+    return redirect(request.referrer or url_for("main.dashboard"))
+
+
 @api_bp.route("/toggle-favorite/<int:resource_id>", methods=["POST"])
 def toggle_favorite(resource_id):
     conn = get_db()
@@ -546,22 +614,40 @@ def reorder_resource():
     except (ValueError, TypeError):
         return jsonify({"success": False, "error": "Invalid field types"}), 400
     
+    # Optional: the full day order after the drag, as resource ids
+    ordered_ids = data.get("ordered_ids")
+    if ordered_ids is not None:
+        # A string like "312" would iterate as digits, so insist on a real list of ids
+        if not isinstance(ordered_ids, list) or not all(
+            isinstance(rid, int) and not isinstance(rid, bool) for rid in ordered_ids
+        ):
+            return jsonify({"success": False, "error": "Invalid field types"}), 400
+        if resource_id not in ordered_ids:
+            return jsonify({"success": False, "error": "ordered_ids must include resource_id"}), 400
+    
     conn = get_db()
     cur = get_db_cursor(conn)
-    # Get all resources for this day
-    cur.execute(
-        "SELECT id FROM resources WHERE phase_index = %s AND week = %s AND day = %s ORDER BY sort_order, id",
-        (phase, week, day)
-    )
-    resources = cur.fetchall()
-    
-    # Update sort orders
-    for i, r in enumerate(resources):
-        cur.execute("UPDATE resources SET sort_order = %s WHERE id = %s", (i * 10, r["id"]))
+    # Keyed by id so each row gets exactly one value: an UPDATE ... FROM that
+    # matches a row twice applies an arbitrary one of the values
+    if ordered_ids:
+        # Client already knows the order: renumber straight from it
+        sort_orders = {rid: i * 10 for i, rid in enumerate(ordered_ids)}
+    else:
+        # Get all resources for this day
+        cur.execute(
+            "SELECT id FROM resources WHERE phase_index = %s AND week = %s AND day = %s ORDER BY sort_order, id",
+            (phase, week, day)
+        )
+        sort_orders = {r["id"]: i * 10 for i, r in enumerate(cur)}
+        # Set the moved resource to its new position
+        sort_orders[resource_id] = new_position * 10 + 5
     
-    # Set the moved resource to its new position
-    cur.execute("UPDATE resources SET sort_order = %s WHERE id = %s", 
-        (new_position * 10 + 5, resource_id))
+    # Update sort orders in one statement (limited to this day's resources)
+    execute_values(cur, """
+        UPDATE resources r SET sort_order = v.sort_order
+        FROM (VALUES %s) AS v(sort_order, id, phase_index, week, day)
+        WHERE r.id = v.id AND r.phase_index = v.phase_index AND r.week = v.week AND r.day = v.day
+    """, [(order, rid, phase, week, day) for rid, order in sort_orders.items()])
     
     cur.close()
     conn.commit()
@@ -582,14 +668,14 @@ def block_day():
     conn = get_db()
     cur = get_db_cursor(conn)
     cur.execute(
-        "INSERT INTO blocked_days (user_id, date, reason) VALUES (%s, %s, %s) ON CONFLICT (date) DO UPDATE SET reason = %s",
-        (current_user.id, date_str, reason, reason)
+        "INSERT INTO blocked_days (user_id, date, reason) VALUES (%s, %s, %s) ON CONFLICT (date) DO UPDATE SET reason = EXCLUDED.reason",
+        (current_user.id, date_str, reason)
     )
     cur.close()
-    conn.commit()
     
-    # Recalculate schedule from this date forward
-    recalculate_schedule_from(date_str)
+    # Recalculate schedule from this date forward in the same transaction
+    recalculate_schedule_from(date_str, commit=False)
+    conn.commit()
     
     flash("Day blocked and schedule shifted.", "success")
     return redirect(url_for("main.calendar_view"))
@@ -608,10 +694,10 @@ def unblock_day():
     cur = get_db_cursor(conn)
     cur.execute("DELETE FROM blocked_days WHERE date = %s", (date_str,))
     cur.close()
-    conn.commit()
     
-    # Recalculate schedule from this date forward
-    recalculate_schedule_from(date_str)
+    # Recalculate schedule from this date forward in the same transaction
+    recalculate_schedule_from(date_str, commit=False)
+    conn.commit()
     
     flash("Day unblocked and schedule shifted.", "success")
     return redirect(url_for("main.calendar_view"))
@@ -668,10 +754,11 @@ def api_add_resource():
         url = data.get("url", "").strip() or None
         resource_type = data.get("resource_type", "link")
         notes = data.get("notes", "").strip() or None
-        estimated_minutes_str = data.get("estimated_minutes", "").strip()
+        # JSON bodies may send a number here, form posts send a string
+        estimated_minutes_str = str(data.get("estimated_minutes") or "").strip()
         difficulty = data.get("difficulty", "").strip() or None
         
-        estimated_minutes_val = int(estimated_minutes) if estimated_minutes_str and estimated_minutes_str.isdigit() else None
+        estimated_minutes_val = int(estimated_minutes_str) if estimated_minutes_str.isdigit() else None
         
         if not title:
             return jsonify({"success": False, "error": "Title is required"}), 400
@@ -699,17 +786,13 @@ def api_add_resource():
             if day_id is None:
                 day_id = get_or_create_inbox(current_user.id)
         
-        # Get max sort_order for this day
-        cur.execute(
-            "SELECT COALESCE(MAX(sort_order), 0) as max_order FROM resources WHERE day_id = %s",
-            (day_id,)
-        )
-        max_order = cur.fetchone()['max_order']
-        
+        # Append after the day's last resource (sort_order computed in the INSERT)
         cur.execute("""
             INSERT INTO resources (user_id, day_id, phase_index, week, day, title, url, resource_type, notes, estimated_minutes, difficulty, sort_order, source)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, 'user') RETURNING id
-        """, (current_user.id, day_id, phase_idx, week_val, day_val, title, url, resource_type, notes, estimated_minutes_val, difficulty, max_order + 1))
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s,
+                    COALESCE((SELECT MAX(sort_order) FROM resources WHERE day_id = %s), 0) + 1, 'user')
+            RETURNING id
+        """, (current_user.id, day_id, phase_idx, week_val, day_val, title, url, resource_type, notes, estimated_minutes_val, difficulty, day_id))
         new_id = cur.fetchone()['id']
         cur.close()
         conn.commit()
@@ -726,25 +809,31 @@ def api_update_resource(resource_id):
         data = request.json
         conn = get_db()
         
-        # Build update query dynamically
-        updates = []
-        values = []
-        allowed_fields = ['title', 'url', 'resource_type', 'notes', 'estimated_minutes', 'difficulty']
-        
-        for field in allowed_fields:
-            if field in data:
-                updates.append(f"{field} = %s")
-                values.append(data[field])
-        
-        if not updates:
+        sent_fields = ALLOWED_FIELDS & data.keys()
+        if not sent_fields:
             return jsonify({"success": False, "error": "No fields to update"}), 400
         
+        resource_type = data.get("resource_type")
+        if resource_type is not None and resource_type not in VALID_RESOURCE_TYPES:
+            return jsonify({"success": False, "error": "Invalid resource type"}), 400
+        
+        # Fixed-shape UPDATE: each column takes the new value only when the
+        # field was sent, so an explicit null still clears it
+        values = []
+        for field in RESOURCE_UPDATE_FIELDS:
+            values.extend((field in sent_fields, data.get(field)))
         values.append(resource_id)
         cur = get_db_cursor(conn)
-        cur.execute(
-            f"UPDATE resources SET {', '.join(updates)} WHERE id = %s",
-            values
-        )
+        cur.execute("""
+            UPDATE resources SET
+                title = CASE WHEN %s THEN %s ELSE title END,
+                url = CASE WHEN %s THEN %s ELSE url END,
+                resource_type = CASE WHEN %s THEN %s ELSE resource_type END,
+                notes = CASE WHEN %s THEN %s ELSE notes END,
+                estimated_minutes = CASE WHEN %s THEN %s ELSE estimated_minutes END,
+                difficulty = CASE WHEN %s THEN %s ELSE difficulty END
+            WHERE id = %s
+        """, values)
         cur.close()
         conn.commit()
         
@@ -811,44 +900,52 @@ def api_reorder_resource(resource_id):
         cur = get_db_cursor(conn)
         
         # Get current resource
-        cur.execute("SELECT sort_order FROM resources WHERE id = %s", (resource_id,))
+        cur.execute("SELECT user_id FROM resources WHERE id = %s", (resource_id,))
         resource = cur.fetchone()
         if not resource:
             cur.close()
             return jsonify({"success": False, "error": "Resource not found"}), 404
         
-        old_position = resource["sort_order"]
-        
-        # Get all resources for this day
+        # Other resources on the target day, in display order (same tie-break
+        # as get_resources_by_week, so unsorted rows keep the order shown)
+        siblings_args = (resource["user_id"], phase_index, week, day, resource_id)
         cur.execute("""
-            SELECT id, sort_order FROM resources 
-            WHERE phase_index = %s AND week = %s AND day = %s
-            ORDER BY sort_order
-        """, (phase_index, week, day))
-        all_resources = cur.fetchall()
+            SELECT sort_order FROM resources
+            WHERE user_id IS NOT DISTINCT FROM %s AND phase_index = %s AND week = %s AND day = %s AND id <> %s
+            ORDER BY sort_order, is_favorite DESC, created_at DESC
+        """, siblings_args)
+        orders = [row["sort_order"] or 0 for row in cur]
+        new_position = max(0, min(new_position, len(orders)))
         
-        # Reorder
-        if new_position < old_position:
-            # Moving up
-            cur.execute("""
-                UPDATE resources 
-                SET sort_order = sort_order + 1 
-                WHERE phase_index = %s AND week = %s AND day = %s 
-                  AND sort_order >= %s AND sort_order < %s
-            """, (phase_index, week, day, new_position, old_position))
+        # Slot the resource into the gap between its new neighbours
+        # (sort_order is spaced by 10, so one UPDATE moves it)
+        prev_order = orders[new_position - 1] if new_position > 0 else None
+        next_order = orders[new_position] if new_position < len(orders) else None
+        if prev_order is None and next_order is None:
+            sort_order = 10
+        elif prev_order is None:
+            sort_order = next_order - 10
+        elif next_order is None:
+            sort_order = prev_order + 10
         else:
-            # Moving down
-            cur.execute("""
-                UPDATE resources 
-                SET sort_order = sort_order - 1 
-                WHERE phase_index = %s AND week = %s AND day = %s 
-                  AND sort_order > %s AND sort_order <= %s
-            """, (phase_index, week, day, old_position, new_position))
+            sort_order = (prev_order + next_order) // 2
+            if sort_order == prev_order:
+                # Gap collapsed: renumber the day 10, 20, 30... and retry
+                cur.execute("""
+                    UPDATE resources r SET sort_order = o.rn * 10
+                    FROM (
+                        SELECT id, ROW_NUMBER() OVER (ORDER BY sort_order, is_favorite DESC, created_at DESC) AS rn
+                        FROM resources
+                        WHERE user_id IS NOT DISTINCT FROM %s AND phase_index = %s AND week = %s AND day = %s AND id <> %s
+                    ) o
+                    WHERE r.id = o.id
+                """, siblings_args)
+                sort_order = new_position * 10 + 5
         
         # Set new position
         cur.execute(
             "UPDATE resources SET sort_order = %s WHERE id = %s",
-            (new_position, resource_id)
+            (sort_order, resource_id)
         )
         conn.commit()
         cur.close()
@@ -864,57 +961,55 @@ def api_calendar_day(date_str):
     conn = get_db()
     cur = get_db_cursor(conn)
     
-    # Check if blocked
-    cur.execute("SELECT reason FROM blocked_days WHERE date = %s", (date_str,))
-    blocked = cur.fetchone()
-    
-    # Get curriculum days for this date
-    curriculum_days = []
+    # Blocked status and hours logged in one round-trip
     cur.execute("""
-        SELECT DISTINCT r.phase_index, r.week, r.day,
-               COUNT(r.id) as resource_count,
-               SUM(CASE WHEN r.status = 'complete' THEN 1 ELSE 0 END) as completed_count
-        FROM resources r
-        WHERE r.scheduled_date = %s
-        GROUP BY r.phase_index, r.week, r.day
+        SELECT EXISTS (SELECT 1 FROM blocked_days WHERE date = %s) as blocked,
+               (SELECT reason FROM blocked_days WHERE date = %s) as blocked_reason,
+               (SELECT COALESCE(SUM(hours), 0) FROM time_logs WHERE date = %s) as hours
+    """, (date_str, date_str, date_str))
+    summary = cur.fetchone()
+    
+    # Get curriculum days for this date: one pass over the day's resources,
+    # grouped by (phase, week, day) in Python instead of a query per group
+    days_by_key = {}
+    cur.execute("""
+        SELECT id, title, status, url, resource_type, phase_index, week, day
+        FROM resources
+        WHERE scheduled_date = %s
+        ORDER BY phase_index, week, day, sort_order
     """, (date_str,))
-    
-    rows = cur.fetchall()
-    for row in rows:
-        # Get resources for this curriculum day
-        cur.execute("""
-            SELECT id, title, status, url, resource_type FROM resources
-            WHERE phase_index = %s AND week = %s AND day = %s AND scheduled_date = %s
-            ORDER BY sort_order
-        """, (row["phase_index"], row["week"], row["day"], date_str))
-        resources = cur.fetchall()
-        
-        curriculum_days.append({
-            "phase": row["phase_index"],
-            "week": row["week"],
-            "day": row["day"],
-            "resource_count": row["resource_count"],
-            "completed_count": row["completed_count"],
-            "resources": [dict(r) for r in resources]
+    for r in cur:
+        key = (r["phase_index"], r["week"], r["day"])
+        entry = days_by_key.get(key)
+        if entry is None:
+            entry = days_by_key[key] = {
+                "phase": r["phase_index"],
+                "week": r["week"],
+                "day": r["day"],
+                "resource_count": 0,
+                "completed_count": 0,
+                "resources": []
+            }
+        entry["resource_count"] += 1
+        if r["status"] == "complete":
+            entry["completed_count"] += 1
+        entry["resources"].append({
+            "id": r["id"], "title": r["title"], "status": r["status"],
+            "url": r["url"], "resource_type": r["resource_type"]
         })
-    
-    # Get hours logged
-    cur.execute("SELECT COALESCE(SUM(hours), 0) as total FROM time_logs WHERE date = %s", (date_str,))
-    hours_result = cur.fetchone()
-    hours = hours_result["total"] if hours_result else 0
+    curriculum_days = list(days_by_key.values())
     cur.close()
     
     return jsonify({
-        "blocked": blocked is not None,
-        "blocked_reason": blocked["reason"] if blocked else None,
+        "blocked": summary["blocked"],
+        "blocked_reason": summary["blocked_reason"],
         "curriculum_days": curriculum_days,
-        "hours": hours
+        "hours": summary["hours"]
     })
 
 
-@api_bp.route("/upload/resource/<int:resource_id>", methods=["POST"])
-def upload_resource_file(resource_id):
-    """Upload file attachment to a resource."""
+def _save_upload(resource_id=None, journal_id=None):
+    """Save the request's uploaded file and record it as an attachment."""
     if 'file' not in request.files:
         return jsonify({"error": "No file"}), 400
     
@@ -924,16 +1019,19 @@ def upload_resource_file(resource_id):
     
     if file and allowed_file(file.filename):
         ext = file.filename.rsplit('.', 1)[1].lower()
-        filename = f"{uuid.uuid4()}.{ext}"
+        filename = f"{secrets.token_urlsafe(16)}.{ext}"
         filepath = UPLOAD_FOLDER / filename
-        file.save(str(filepath))
+        # Stream to disk in 1 MiB chunks rather than the 16 KiB default
+        file.save(str(filepath), buffer_size=1 << 20)
+        # save() leaves the upload stream at its end, so its offset is the size
+        file_size = file.stream.tell()
         
         conn = get_db()
         cur = get_db_cursor(conn)
         cur.execute("""
-            INSERT INTO attachments (filename, original_filename, file_type, file_size, resource_id)
-            VALUES (%s, %s, %s, %s, %s) RETURNING id
-        """, (filename, file.filename, ext, filepath.stat().st_size, resource_id))
+            INSERT INTO attachments (filename, original_filename, file_type, file_size, resource_id, journal_id)
+            VALUES (%s, %s, %s, %s, %s, %s) RETURNING id
+        """, (filename, file.filename, ext, file_size, resource_id, journal_id))
         conn.commit()
         cur.close()
         
@@ -942,34 +1040,16 @@ def upload_resource_file(resource_id):
     return jsonify({"error": "File type not allowed"}), 400
 
 
+@api_bp.route("/upload/resource/<int:resource_id>", methods=["POST"])
+def upload_resource_file(resource_id):
+    """Upload file attachment to a resource."""
+    return _save_upload(resource_id=resource_id)
+
+
 @api_bp.route("/upload/journal/<int:journal_id>", methods=["POST"])
 def upload_journal_file(journal_id):
     """Upload file attachment to a journal entry."""
-    if 'file' not in request.files:
-        return jsonify({"error": "No file"}), 400
-    
-    file = request.files['file']
-    if file.filename == '':
-        return jsonify({"error": "No filename"}), 400
-    
-    if file and allowed_file(file.filename):
-        ext = file.filename.rsplit('.', 1)[1].lower()
-        filename = f"{uuid.uuid4()}.{ext}"
-        filepath = UPLOAD_FOLDER / filename
-        file.save(str(filepath))
-        
-        conn = get_db()
-        cur = get_db_cursor(conn)
-        cur.execute("""
-            INSERT INTO attachments (filename, original_filename, file_type, file_size, journal_id)
-            VALUES (%s, %s, %s, %s, %s) RETURNING id
-        """, (filename, file.filename, ext, filepath.stat().st_size, journal_id))
-        conn.commit()
-        cur.close()
-        
-        return jsonify({"success": True, "filename": filename})
-    
-    return jsonify({"error": "File type not allowed"}), 400
+    return _save_upload(journal_id=journal_id)
 
 
 @api_bp.route("/api/attachments/resource/<int:resource_id>")
@@ -1066,7 +1146,7 @@ def api_metric_resources():
     cur.close()
     
     return jsonify({
-        "resources": [dict(r) for r in resources]
+        "resources": resources
     })
 
 
@@ -8,28 +8,27 @@ import json
 import psycopg2
 import calendar
 import uuid
-from datetime import datetime
-from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, jsonify, current_app, send_from_directory
+from datetime import date, datetime
+from flask import Blueprint, render_template, request, redirect, url_for, flash, Response, jsonify, current_app, send_from_directory, stream_with_context
 from flask_login import login_user, logout_user, login_required, current_user
 from constants import STATUS_CYCLE
 
 # Import from new modular structure
 from database import get_db, get_db_cursor
 from utils import (
-    load_curriculum, get_start_date, set_start_date, calculate_schedule,
+    load_curriculum, get_curriculum_totals, get_start_date, set_start_date, calculate_schedule,
     recalculate_schedule_from, get_projected_end_date, allowed_file, UPLOAD_FOLDER
 )
 from services.progress import (
     init_if_needed, get_progress, update_progress,
-    get_current_week_hours, get_total_hours, get_hours_for_phase,
-    get_recent_logs, get_completed_metrics, get_current_streak,
+    get_current_week_hours, get_total_hours, get_hours_by_phase,
+    get_recent_logs, get_completed_metrics, get_completed_metric_counts, get_current_streak,
     get_longest_streak, get_week_activity, get_today_position,
     get_hours_today, get_overdue_days
 )
 from services.resources import (
-    get_resources, get_all_resources, get_all_tags, get_resources_by_week,
-    get_day_completion, get_week_completion, get_phase_completion,
-    get_continue_resource
+    get_resources, search_resources, get_all_tags, get_resources_by_week,
+    get_phase_completion_breakdown, get_continue_resource
 )
 from services.reporting import get_burndown_data
 from services.progress import log_activity
@@ -109,17 +108,25 @@ def dashboard(view_phase=None, view_week=None):
     phase = curriculum["phases"][display_phase]
     week_hours = get_current_week_hours()
     total_hours = get_total_hours()
-    curriculum_total = sum(p["hours"] for p in curriculum["phases"])
+    totals = get_curriculum_totals()
+    curriculum_total = totals["total_hours"]
     expected_weekly = phase["hours"] / phase["weeks"] if phase["weeks"] > 0 else 0
     completed = get_completed_metrics(display_phase)
     completed_texts = {m["metric_text"] for m in completed}
-    total_weeks = sum(p["weeks"] for p in curriculum["phases"])
-    weeks_before = sum(p["weeks"] for p in curriculum["phases"][:display_phase])
+    total_weeks = totals["total_weeks"]
+    weeks_before = totals["weeks_prefix"][display_phase]
     current_absolute_week = weeks_before + display_week
     overall_progress = (total_hours / curriculum_total * 100) if curriculum_total > 0 else 0
     recent_logs = get_recent_logs()
     resources = get_resources(display_phase)
-    grouped_week, ungrouped_week = get_resources_by_week(display_phase, display_week)
+    # Search and tag filters are applied in SQL by get_resources_by_week()
+    search_query = request.args.get("q", "").strip()
+    tag_filter = request.args.get("tag", "").strip()
+    grouped_week, ungrouped_week = get_resources_by_week(display_phase, display_week,
+                                                         search_query=search_query, tag=tag_filter)
+    if search_query or tag_filter:
+        # Only days with matches are shown when filtering
+        grouped_week = {day: rs for day, rs in grouped_week.items() if rs}
     all_tags = get_all_tags()
     
     # Batch query for resource hours (fixes N+1 query problem)
@@ -131,7 +138,8 @@ def dashboard(view_phase=None, view_week=None):
     resource_hours = {}
     if all_resource_ids:
         conn = get_db()
-        cur = get_db_cursor(conn)
+        # Plain tuple cursor: (resource_id, total_hours) rows feed dict() directly
+        cur = conn.cursor()
         placeholders = ','.join(['%s'] * len(all_resource_ids))
         cur.execute(f"""
             SELECT resource_id, COALESCE(SUM(hours), 0) as total_hours
@@ -139,12 +147,9 @@ def dashboard(view_phase=None, view_week=None):
             WHERE resource_id IN ({placeholders})
             GROUP BY resource_id
         """, all_resource_ids)
-        hours_results = cur.fetchall()
+        hours_map = dict(cur)
         cur.close()
         
-        # Create lookup dictionary
-        hours_map = {row["resource_id"]: row["total_hours"] for row in hours_results}
-        
         # Populate resource_hours dict (only non-zero hours)
         resource_hours = {r["id"]: hours_map.get(r["id"], 0) 
                           for r in resources if hours_map.get(r["id"], 0) > 0}
@@ -153,83 +158,41 @@ def dashboard(view_phase=None, view_week=None):
         for day_resources in grouped_week.values():
             for r in day_resources:
                 r["logged_hours"] = hours_map.get(r["id"], 0)
+    # Per-phase hours and metric counts in one grouped query each
+    hours_by_phase = get_hours_by_phase()
+    metrics_done_by_phase = get_completed_metric_counts()
     phases_data = []
     for i, p in enumerate(curriculum["phases"]):
-        phase_completed = get_completed_metrics(i)
+        metrics_done = metrics_done_by_phase.get(i, 0)
         metrics_total = len(p.get("metrics", []))
         phases_data.append({
             "index": i, "name": p["name"], "weeks": p["weeks"], "hours": p["hours"],
-            "logged": get_hours_for_phase(i, curriculum), "is_current": i == current_phase,
-            "is_complete": len(phase_completed) == metrics_total if metrics_total > 0 else False, "metrics_done": len(phase_completed),
+            "logged": hours_by_phase.get(i, 0), "is_current": i == current_phase,
+            "is_complete": metrics_done == metrics_total if metrics_total > 0 else False, "metrics_done": metrics_done,
             "metrics_total": metrics_total
         })
     
-    # Get search query and tag filter if present
-    search_query = request.args.get("q", "").strip()
-    tag_filter = request.args.get("tag", "").strip()
-    
-    # Apply filters
-    if search_query or tag_filter:
-        filtered_grouped = {}
-        for day, day_resources in grouped_week.items():
-            filtered_day = day_resources
-            
-            # Apply search filter
-            if search_query:
-                search_lower = search_query.lower()
-                filtered_day = [
-                    r for r in filtered_day
-                    if search_lower in (r.get("title", "") or "").lower()
-                    or search_lower in (r.get("notes", "") or "").lower()
-                    or search_lower in (r.get("topic", "") or "").lower()
-                ]
-            
-            # Apply tag filter
-            if tag_filter:
-                filtered_day = [
-                    r for r in filtered_day
-                    if tag_filter in r.get("tags", [])
-                ]
-            
-            if filtered_day:
-                filtered_grouped[day] = filtered_day
-        
-        grouped_week = filtered_grouped
-        
-        # Apply same filters to ungrouped
-        filtered_ungrouped = ungrouped_week
-        if search_query:
-            search_lower = search_query.lower()
-            filtered_ungrouped = [
-                r for r in filtered_ungrouped
-                if search_lower in (r.get("title", "") or "").lower()
-                or search_lower in (r.get("notes", "") or "").lower()
-                or search_lower in (r.get("topic", "") or "").lower()
-            ]
-        if tag_filter:
-            filtered_ungrouped = [
-                r for r in filtered_ungrouped
-                if tag_filter in r.get("tags", [])
-            ]
-        ungrouped_week = filtered_ungrouped
-    
     # Calculate milestone days (days with at least one milestone resource)
     milestone_days = {}
     for day in range(1, 7):
         milestone_days[day] = any(r.get('is_milestone', False) for r in grouped_week.get(day, []))
     
-    # Calculate completion rollups
-    phase_completed, phase_total, phase_percent = get_phase_completion(display_phase)
-    week_completed, week_total, week_percent = get_week_completion(display_phase, display_week)
+    # Calculate completion rollups (phase, weeks and days from one grouped query)
+    completion = get_phase_completion_breakdown(display_phase)
+    phase_completed, phase_total = completion["phase"]
+    phase_percent = (phase_completed / phase_total * 100) if phase_total > 0 else 0
+    week_completed, week_total = completion["weeks"].get(display_week, (0, 0))
+    week_percent = (week_completed / week_total * 100) if week_total > 0 else 0
     day_completions = {}
     for day in range(1, 7):
-        day_completed, day_total = get_day_completion(display_phase, display_week, day)
+        day_completed, day_total = completion["days"].get((display_week, day), (0, 0))
         day_completions[day] = {"completed": day_completed, "total": day_total}
     
     # Calculate completion for all weeks in this phase for tab indicators
     all_weeks_completion = {}
     for w in range(1, phase["weeks"] + 1):
-        w_completed, w_total, w_percent = get_week_completion(display_phase, w)
+        w_completed, w_total = completion["weeks"].get(w, (0, 0))
+        w_percent = (w_completed / w_total * 100) if w_total > 0 else 0
         all_weeks_completion[w] = {
             "completed": w_completed,
             "total": w_total,
@@ -252,7 +215,7 @@ def dashboard(view_phase=None, view_week=None):
     continue_resource = get_continue_resource(current_phase, current_week)
     
     # Get today's journal entry
-    today_date = datetime.now().strftime("%Y-%m-%d")
+    today_date = date.today().isoformat()
     conn = get_db()
     cur = get_db_cursor(conn)
     cur.execute("SELECT * FROM journal_entries WHERE date = %s", (today_date,))
@@ -290,7 +253,6 @@ def dashboard(view_phase=None, view_week=None):
             (today_position['expected_phase'], today_position['expected_week'], today_position['expected_day'])
         )
         expected_resources = cur.fetchall()
-        expected_resources = [dict(r) for r in expected_resources]
         cur.close()
     
     return render_template("dashboard.html", phase=phase, phase_index=display_phase, current_week=display_week,
@@ -315,7 +277,6 @@ def dashboard(view_phase=None, view_week=None):
 def resources_page():
     """Show all resources with filters."""
     curriculum = load_curriculum()
-    all_resources = get_all_resources()
     
     # Read filter parameters
     search_query = request.args.get("q", "").strip()
@@ -324,58 +285,26 @@ def resources_page():
     filter_tag = request.args.get("tag", "").strip()
     filter_status = request.args.get("status", "").strip()
     
-    # Apply filters
-    filtered_resources = all_resources
-    
-    # Search filter (title, notes, topic)
-    if search_query:
-        search_lower = search_query.lower()
-        filtered_resources = [
-            r for r in filtered_resources
-            if search_lower in (r.get("title", "") or "").lower()
-            or search_lower in (r.get("notes", "") or "").lower()
-            or search_lower in (r.get("topic", "") or "").lower()
-        ]
-    
-    # Type filter
-    if filter_type:
-        filtered_resources = [
-            r for r in filtered_resources
-            if r.get("resource_type") == filter_type
-        ]
-    
-    # Phase filter
+    phase_index = None
     if filter_phase:
         try:
             phase_index = int(filter_phase)
-            filtered_resources = [
-                r for r in filtered_resources
-                if r.get("phase_index") == phase_index
-            ]
         except ValueError:
             pass
     
-    # Tag filter
-    if filter_tag:
-        filtered_resources = [
-            r for r in filtered_resources
-            if filter_tag in r.get("tags", [])
-        ]
-    
-    # Status filter
-    if filter_status == "completed":
-        filtered_resources = [r for r in filtered_resources if r.get("is_completed")]
-    elif filter_status == "pending":
-        filtered_resources = [r for r in filtered_resources if not r.get("is_completed")]
-    elif filter_status == "favorites":
-        filtered_resources = [r for r in filtered_resources if r.get("is_favorite")]
+    # Every filter is applied in SQL; only matching rows come back
+    filtered_resources = search_resources(
+        search_query=search_query, resource_type=filter_type, phase_index=phase_index,
+        tag=filter_tag, status=filter_status
+    )
     
     # Batch query for resource hours (fixes N+1 query problem)
     resource_hours = {}
     if filtered_resources:
         resource_ids = [r["id"] for r in filtered_resources]
         conn = get_db()
-        cur = get_db_cursor(conn)
+        # Plain tuple cursor: (resource_id, total_hours) rows feed dict() directly
+        cur = conn.cursor()
         placeholders = ','.join(['%s'] * len(resource_ids))
         cur.execute(f"""
             SELECT resource_id, COALESCE(SUM(hours), 0) as total_hours
@@ -383,31 +312,21 @@ def resources_page():
             WHERE resource_id IN ({placeholders})
             GROUP BY resource_id
         """, resource_ids)
-        hours_results = cur.fetchall()
+        hours_map = dict(cur)
         cur.close()
         
-        # Create lookup dictionary
-        hours_map = {row["resource_id"]: row["total_hours"] for row in hours_results}
-        
         # Populate resource_hours dict (only non-zero hours)
         resource_hours = {r["id"]: hours_map.get(r["id"], 0) 
                           for r in filtered_resources if hours_map.get(r["id"], 0) > 0}
     
-    # Get overdue resources
-    conn = get_db()
-    today = datetime.now().strftime("%Y-%m-%d")
-    overdue_resource_ids = set()
-    cur = get_db_cursor(conn)
-    cur.execute("""
-        SELECT DISTINCT id FROM resources
-        WHERE scheduled_date < %s AND scheduled_date IS NOT NULL
-          AND status != 'complete'
-    """, (today,))
-    overdue_resources = cur.fetchall()
-    cur.close()
-    for row in overdue_resources:
-        overdue_resource_ids.add(row["id"])
-    
+    # Get overdue resources from the rows already loaded (no second scan of resources)
+    today = date.today()
+    overdue_resource_ids = {
+        r["id"] for r in filtered_resources
+        if r.get("scheduled_date") is not None and r["scheduled_date"] < today
+        and r.get("status") != "complete"
+    }
+
     return render_template("resources.html", 
         resources=filtered_resources,
         phases=curriculum["phases"],
@@ -461,14 +380,14 @@ def journal():
             "index": i, "name": p["name"], "weeks": p["weeks"]
         })
     
-    return render_template("journal.html", entries=entries, today=datetime.now().strftime("%Y-%m-%d"),
+    return render_template("journal.html", entries=entries, today=date.today().isoformat(),
                           phases=phases_data, today_position=today_position, editing=None)
 
 
 @main_bp.route("/journal", methods=["POST"])
 def save_journal():
     """Save or update today's journal entry."""
-    date = request.form.get("date", datetime.now().strftime("%Y-%m-%d"))
+    entry_date = request.form.get("date", date.today().isoformat())
     content = request.form.get("content", "").strip()
     mood = request.form.get("mood", "").strip()
     
@@ -485,31 +404,31 @@ def save_journal():
     conn = get_db()
     cur = get_db_cursor(conn)
     # Check if entry exists for this date
-    cur.execute("SELECT id FROM journal_entries WHERE date = %s", (date,))
+    cur.execute("SELECT id FROM journal_entries WHERE date = %s", (entry_date,))
     existing = cur.fetchone()
     
     if existing:
         if link_to_day and phase_index_val is not None:
             cur.execute(
                 "UPDATE journal_entries SET content = %s, mood = %s, phase_index = %s, week = %s, day = %s, updated_at = %s WHERE user_id = %s AND date = %s",
-                (content, mood, phase_index_val, week_val, day_val, datetime.now().isoformat(), current_user.id, date)
+                (content, mood, phase_index_val, week_val, day_val, datetime.now().isoformat(), current_user.id, entry_date)
             )
         else:
             cur.execute(
                 "UPDATE journal_entries SET content = %s, mood = %s, phase_index = NULL, week = NULL, day = NULL, updated_at = %s WHERE user_id = %s AND date = %s",
-                (content, mood, datetime.now().isoformat(), current_user.id, date)
+                (content, mood, datetime.now().isoformat(), current_user.id, entry_date)
             )
         flash("Reflection locked in!", "success")
     else:
         if link_to_day and phase_index_val is not None:
             cur.execute(
-                "INSERT INTO journal_entries (user_id, date, content, mood, phase_index, week, day) VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT (date) DO UPDATE SET content = %s, mood = %s, phase_index = %s, week = %s, day = %s, updated_at = CURRENT_TIMESTAMP",
-                (current_user.id, date, content, mood, phase_index_val, week_val, day_val, content, mood, phase_index_val, week_val, day_val)
+                "INSERT INTO journal_entries (user_id, date, content, mood, phase_index, week, day) VALUES (%s, %s, %s, %s, %s, %s, %s) ON CONFLICT (date) DO UPDATE SET content = EXCLUDED.content, mood = EXCLUDED.mood, phase_index = EXCLUDED.phase_index, week = EXCLUDED.week, day = EXCLUDED.day, updated_at = CURRENT_TIMESTAMP",
+                (current_user.id, entry_date, content, mood, phase_index_val, week_val, day_val)
             )
         else:
             cur.execute(
-                "INSERT INTO journal_entries (user_id, date, content, mood) VALUES (%s, %s, %s, %s) ON CONFLICT (date) DO UPDATE SET content = %s, mood = %s, updated_at = CURRENT_TIMESTAMP",
-                (current_user.id, date, content, mood, content, mood)
+                "INSERT INTO journal_entries (user_id, date, content, mood) VALUES (%s, %s, %s, %s) ON CONFLICT (date) DO UPDATE SET content = EXCLUDED.content, mood = EXCLUDED.mood, updated_at = CURRENT_TIMESTAMP",
+                (current_user.id, entry_date, content, mood)
             )
         flash("Reflection locked in", "success")
     
@@ -576,7 +495,7 @@ def edit_journal(entry_id):
             "index": i, "name": p["name"], "weeks": p["weeks"]
         })
     
-    return render_template("journal.html", entries=entries, today=datetime.now().strftime("%Y-%m-%d"),
+    return render_template("journal.html", entries=entries, today=date.today().isoformat(),
                           editing=dict(entry), phases=phases_data, today_position=None)
 
 
@@ -614,73 +533,51 @@ def curriculum_editor():
     curriculum = load_curriculum()
     conn = get_db()
     
+    # Load every placed resource once and bucket it by phase/week/day
+    # (replaces per-phase, per-week and per-day queries)
+    cur = get_db_cursor(conn)
+    cur.execute("""
+        SELECT * FROM resources
+        WHERE phase_index IS NOT NULL
+        ORDER BY phase_index, week, day, sort_order
+    """)
+    by_day = {}
+    week_counts = {}
+    phase_counts = {}
+    for r in cur:
+        phase_counts[r["phase_index"]] = phase_counts.get(r["phase_index"], 0) + 1
+        week_key = (r["phase_index"], r["week"])
+        week_counts[week_key] = week_counts.get(week_key, 0) + 1
+        if r["day"]:
+            by_day.setdefault(week_key, {}).setdefault(r["day"], []).append(r)
+    cur.close()
+    
     # Build tree structure: Phase -> Week -> Day -> Resources
     curriculum_tree = []
     
     for phase_idx, phase in enumerate(curriculum["phases"]):
         weeks_data = []
         for week_num in range(1, phase["weeks"] + 1):
-            days_data = []
-            # Get all days that have resources for this week
-            cur = get_db_cursor(conn)
-            cur.execute("""
-                SELECT DISTINCT day FROM resources 
-                WHERE phase_index = %s AND week = %s
-                ORDER BY day
-            """, (phase_idx, week_num))
-            existing_days = cur.fetchall()
-            cur.close()
-            
-            day_numbers = [row["day"] for row in existing_days if row["day"]]
-            if not day_numbers:
-                # If no days exist, show days 1-6
-                day_numbers = list(range(1, 7))
+            week_days = by_day.get((phase_idx, week_num), {})
+            # If no days exist, show days 1-6
+            day_numbers = sorted(week_days) or list(range(1, 7))
             
-            for day_num in day_numbers:
-                # Get resources for this day
-                cur = get_db_cursor(conn)
-                cur.execute("""
-                    SELECT * FROM resources 
-                    WHERE phase_index = %s AND week = %s AND day = %s
-                    ORDER BY sort_order
-                """, (phase_idx, week_num, day_num))
-                resources = cur.fetchall()
-                cur.close()
-                
-                days_data.append({
-                    "number": day_num,
-                    "resources": [dict(r) for r in resources]
-                })
-            
-            # Calculate week resource count
-            cur = get_db_cursor(conn)
-            cur.execute(
-                "SELECT COUNT(*) as count FROM resources WHERE phase_index = %s AND week = %s",
-                (phase_idx, week_num)
-            )
-            week_count = cur.fetchone()["count"]
-            cur.close()
+            days_data = [
+                {"number": day_num, "resources": week_days.get(day_num, [])}
+                for day_num in day_numbers
+            ]
             
             weeks_data.append({
                 "number": week_num,
                 "days": days_data,
-                "resource_count": week_count
+                "resource_count": week_counts.get((phase_idx, week_num), 0)
             })
         
-        # Calculate phase resource count
-        cur = get_db_cursor(conn)
-        cur.execute(
-            "SELECT COUNT(*) as count FROM resources WHERE phase_index = %s",
-            (phase_idx,)
-        )
-        phase_count = cur.fetchone()["count"]
-        cur.close()
-        
         curriculum_tree.append({
             "index": phase_idx,
             "name": phase["name"],
             "weeks": weeks_data,
-            "resource_count": phase_count
+            "resource_count": phase_counts.get(phase_idx, 0)
         })
     
     return render_template("curriculum_editor.html", curriculum_tree=curriculum_tree)
@@ -697,21 +594,45 @@ def reports():
 @main_bp.route("/export")
 def export_data():
     conn = get_db()
+    # Read every table from one snapshot so the export is consistent
+    conn.commit()
     cur = get_db_cursor(conn)
+    cur.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
     cur.execute("SELECT * FROM config")
-    config = {r["key"]: r["value"] for r in cur.fetchall()}
-    cur.execute("SELECT date, hours, notes, phase_index FROM time_logs ORDER BY date")
-    time_logs = [dict(r) for r in cur.fetchall()]
-    cur.execute("SELECT phase_index, metric_text, completed_date FROM completed_metrics")
-    metrics = [dict(r) for r in cur.fetchall()]
-    cur.execute("SELECT phase_index, week, day, title, topic, url, resource_type, notes, is_completed, is_favorite, source FROM resources")
-    resources = [dict(r) for r in cur.fetchall()]
-    cur.execute("SELECT name, color FROM tags")
-    tags = [dict(r) for r in cur.fetchall()]
+    config = {r["key"]: r["value"] for r in cur}
     cur.close()
-    data = {"exported_at": datetime.now().isoformat(), "config": config, "time_logs": time_logs,
-            "completed_metrics": metrics, "resources": resources, "tags": tags}
-    return Response(json.dumps(data, indent=2), mimetype="application/json",
+    sections = [
+        ("time_logs", "SELECT date, hours, notes, phase_index FROM time_logs ORDER BY date"),
+        ("completed_metrics", "SELECT phase_index, metric_text, completed_date FROM completed_metrics"),
+        ("resources", "SELECT phase_index, week, day, title, topic, url, resource_type, notes, is_completed, is_favorite, source FROM resources"),
+        ("tags", "SELECT name, color FROM tags"),
+    ]
+    
+    # Compact separators: no whitespace padding in a machine-read export
+    encode = json.JSONEncoder(separators=(",", ":"), default=str).encode
+    
+    def generate():
+        # Stream the JSON document section by section instead of building it in memory
+        yield '{"exported_at":%s,"config":%s' % (encode(datetime.now().isoformat()), encode(config))
+        for key, query in sections:
+            yield f',"{key}":['
+            # Server-side cursor: rows are fetched in batches, not all at once
+            section_cur = get_db_cursor(conn, name=f"export_{key}")
+            section_cur.itersize = 1000
+            section_cur.execute(query)
+            # Send one chunk per fetched batch rather than one write per row
+            first = True
+            while True:
+                rows = section_cur.fetchmany(section_cur.itersize)
+                if not rows:
+                    break
+                yield ("" if first else ",") + ",".join(map(encode, rows))
+                first = False
+            section_cur.close()
+            yield "]"
+        yield "}"
+    
+    return Response(stream_with_context(generate()), mimetype="application/json",
         headers={"Content-Disposition": "attachment;filename=curriculum_export.json"})
 
 
@@ -723,8 +644,10 @@ def update_start_date():
         flash("Oops, start date is required", "error")
         return redirect(url_for("main.dashboard"))
     
-    set_start_date(date_str)
-    calculate_schedule(date_str)
+    # Save the date and the schedule built from it as one transaction
+    set_start_date(date_str, commit=False)
+    calculate_schedule(date_str, commit=False)
+    get_db().commit()
     flash("Start date locked in! Schedule calculated.", "success")
     return redirect(url_for("main.dashboard"))
 
@@ -736,15 +659,14 @@ def reset():
     cur.execute("DELETE FROM config")
     cur.execute("DELETE FROM time_logs")
     cur.execute("DELETE FROM completed_metrics")
-    cur.execute("UPDATE resources SET is_completed = FALSE")
-    cur.execute("UPDATE resources SET is_favorite = FALSE")
-    cur.execute("UPDATE resources SET status = 'not_started'")
-    cur.execute("UPDATE resources SET completed_at = NULL")
-    conn.commit()
+    cur.execute(
+        "UPDATE resources SET is_completed = FALSE, is_favorite = FALSE, status = 'not_started', completed_at = NULL"
+    )
     cur.close()
     
-    # Log activity
-    log_activity("progress_reset", None, None, "All progress reset")
+    # Log activity in the same transaction
+    log_activity("progress_reset", None, None, "All progress reset", commit=False)
+    conn.commit()
     
     init_if_needed()
     flash("Fresh slate!", "info")
@@ -754,7 +676,8 @@ def reset():
 @main_bp.route("/uploads/<filename>")
 def serve_file(filename):
     """Serve uploaded files."""
-    return send_from_directory(str(UPLOAD_FOLDER), filename)
+    # Stored names are random and never reused, so clients can cache for a year
+    return send_from_directory(str(UPLOAD_FOLDER), filename, conditional=True, max_age=31536000)
 
 
 @main_bp.route("/attachment/<int:attachment_id>/delete", methods=["POST"])
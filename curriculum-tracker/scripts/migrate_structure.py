@@ -10,6 +10,7 @@ This script:
 5. Handles orphan resources by moving them to a catch-all "Migrated Items" structure
 """
 
+import io
 import sys
 import os
 import yaml
@@ -20,7 +21,7 @@ APP_DIR = Path(__file__).parent.parent
 sys.path.insert(0, str(APP_DIR))
 
 import psycopg2
-from psycopg2.extras import RealDictCursor
+from psycopg2.extras import RealDictCursor, execute_values
 
 # Define curriculum path (same as utils.py)
 CURRICULUM_PATH = APP_DIR / "curriculum.yaml"
@@ -53,124 +54,113 @@ def get_db_connection():
     return psycopg2.connect(**DB_CONFIG)
 
 
-def get_db_cursor(conn):
-    """Get cursor that returns rows as dictionaries."""
-    return conn.cursor(cursor_factory=RealDictCursor)
+def get_db_cursor(conn, name=None):
+    """Get cursor that returns rows as dictionaries (server-side if named)."""
+    return conn.cursor(name=name, cursor_factory=RealDictCursor)
 
 
-def create_phase(conn, user_id, title, order_index, color='#6366f1'):
+def create_phase(cur, user_id, title, order_index, color='#6366f1'):
     """Create or get existing phase for a user."""
-    cur = get_db_cursor(conn)
-    try:
-        # Try to insert (will fail silently if exists due to unique constraint)
-        cur.execute("""
-            INSERT INTO phases (user_id, title, order_index, color)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (user_id, order_index) DO NOTHING
-            RETURNING id
-        """, (user_id, title, order_index, color))
-        
-        result = cur.fetchone()
-        if result:
-            return result['id']
-        
-        # If insert didn't return ID, phase already exists - fetch it
-        cur.execute("""
-            SELECT id FROM phases
-            WHERE user_id = %s AND order_index = %s
-        """, (user_id, order_index))
-        existing = cur.fetchone()
-        return existing['id'] if existing else None
-    finally:
-        cur.close()
+    # Try to insert (will fail silently if exists due to unique constraint)
+    cur.execute("""
+        INSERT INTO phases (user_id, title, order_index, color)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (user_id, order_index) DO NOTHING
+        RETURNING id
+    """, (user_id, title, order_index, color))
+    
+    result = cur.fetchone()
+    if result:
+        return result['id']
+    
+    # If insert didn't return ID, phase already exists - fetch it
+    cur.execute("""
+        SELECT id FROM phases
+        WHERE user_id = %s AND order_index = %s
+    """, (user_id, order_index))
+    existing = cur.fetchone()
+    return existing['id'] if existing else None
 
 
-def create_week(conn, user_id, phase_id, title, order_index):
+def create_week(cur, user_id, phase_id, title, order_index):
     """Create or get existing week for a phase."""
-    cur = get_db_cursor(conn)
-    try:
-        cur.execute("""
-            INSERT INTO weeks (user_id, phase_id, title, order_index)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (user_id, phase_id, order_index) DO NOTHING
-            RETURNING id
-        """, (user_id, phase_id, title, order_index))
-        
-        result = cur.fetchone()
-        if result:
-            return result['id']
-        
-        # If insert didn't return ID, week already exists - fetch it
-        cur.execute("""
-            SELECT id FROM weeks
-            WHERE user_id = %s AND phase_id = %s AND order_index = %s
-        """, (user_id, phase_id, order_index))
-        existing = cur.fetchone()
-        return existing['id'] if existing else None
-    finally:
-        cur.close()
+    cur.execute("""
+        INSERT INTO weeks (user_id, phase_id, title, order_index)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (user_id, phase_id, order_index) DO NOTHING
+        RETURNING id
+    """, (user_id, phase_id, title, order_index))
+    
+    result = cur.fetchone()
+    if result:
+        return result['id']
+    
+    # If insert didn't return ID, week already exists - fetch it
+    cur.execute("""
+        SELECT id FROM weeks
+        WHERE user_id = %s AND phase_id = %s AND order_index = %s
+    """, (user_id, phase_id, order_index))
+    existing = cur.fetchone()
+    return existing['id'] if existing else None
 
 
-def create_day(conn, user_id, week_id, title, order_index):
+def create_day(cur, user_id, week_id, title, order_index):
     """Create or get existing day for a week."""
-    cur = get_db_cursor(conn)
-    try:
-        cur.execute("""
-            INSERT INTO days (user_id, week_id, title, order_index)
-            VALUES (%s, %s, %s, %s)
-            ON CONFLICT (user_id, week_id, order_index) DO NOTHING
-            RETURNING id
-        """, (user_id, week_id, title, order_index))
-        
-        result = cur.fetchone()
-        if result:
-            return result['id']
-        
-        # If insert didn't return ID, day already exists - fetch it
-        cur.execute("""
-            SELECT id FROM days
-            WHERE user_id = %s AND week_id = %s AND order_index = %s
-        """, (user_id, week_id, order_index))
-        existing = cur.fetchone()
-        return existing['id'] if existing else None
-    finally:
-        cur.close()
+    cur.execute("""
+        INSERT INTO days (user_id, week_id, title, order_index)
+        VALUES (%s, %s, %s, %s)
+        ON CONFLICT (user_id, week_id, order_index) DO NOTHING
+        RETURNING id
+    """, (user_id, week_id, title, order_index))
+    
+    result = cur.fetchone()
+    if result:
+        return result['id']
+    
+    # If insert didn't return ID, day already exists - fetch it
+    cur.execute("""
+        SELECT id FROM days
+        WHERE user_id = %s AND week_id = %s AND order_index = %s
+    """, (user_id, week_id, order_index))
+    existing = cur.fetchone()
+    return existing['id'] if existing else None
 
 
-def get_or_create_orphan_inbox(conn, user_id):
+def get_or_create_orphan_inbox(cur, user_id):
     """Get or create the catch-all structure for orphan resources."""
-    cur = get_db_cursor(conn)
-    try:
-        # Get or create "Migrated Items" phase
-        phase_id = create_phase(conn, user_id, "Migrated Items", 99999, '#9ca3af')
-        
-        # Get or create "Unsorted" week
-        week_id = create_week(conn, user_id, phase_id, "Unsorted", 1)
-        
-        # Get or create "Inbox" day
-        day_id = create_day(conn, user_id, week_id, "Inbox", 1)
-        
-        return day_id
-    finally:
-        cur.close()
+    # Get or create "Migrated Items" phase
+    phase_id = create_phase(cur, user_id, "Migrated Items", 99999, '#9ca3af')
+    
+    # Get or create "Unsorted" week
+    week_id = create_week(cur, user_id, phase_id, "Unsorted", 1)
+    
+    # Get or create "Inbox" day
+    day_id = create_day(cur, user_id, week_id, "Inbox", 1)
+    
+    return day_id
 
 
 def migrate_user(conn, user_id, curriculum_data):
     """Migrate curriculum structure for a single user."""
+    # One cursor serves every statement for this user, including the helpers
     cur = get_db_cursor(conn)
     try:
         print(f"  Migrating user {user_id}...")
+        # Each user is a savepoint inside the single migration transaction,
+        # so a failure only discards that user's work
+        cur.execute("SAVEPOINT migrate_user")
         
         # Track created day IDs for backfilling
         day_map = {}  # (phase_index, week, day) -> day_id
+        week_keys = {}  # week_id -> (phase_index, week)
         
-        # Create phases and their weeks/days
+        # Create phases and their weeks (days are batched below)
         for phase_idx, phase_data in enumerate(curriculum_data.get('phases', [])):
             phase_title = phase_data.get('name', f'Phase {phase_idx + 1}')
             num_weeks = phase_data.get('weeks', 0)
             
             # Create phase
-            phase_id = create_phase(conn, user_id, phase_title, phase_idx)
+            phase_id = create_phase(cur, user_id, phase_title, phase_idx)
             if not phase_id:
                 print(f"    Warning: Failed to create phase {phase_idx}")
                 continue
@@ -178,77 +168,91 @@ def migrate_user(conn, user_id, curriculum_data):
             # Create weeks for this phase
             for week_num in range(1, num_weeks + 1):
                 week_title = f"Week {week_num}"
-                week_id = create_week(conn, user_id, phase_id, week_title, week_num)
+                week_id = create_week(cur, user_id, phase_id, week_title, week_num)
                 if not week_id:
                     print(f"    Warning: Failed to create week {week_num} for phase {phase_idx}")
                     continue
-                
-                # Create 6 days for this week
-                for day_num in range(1, 7):
-                    day_title = f"Day {day_num}"
-                    day_id = create_day(conn, user_id, week_id, day_title, day_num)
-                    if day_id:
-                        day_map[(phase_idx, week_num, day_num)] = day_id
+                week_keys[week_id] = (phase_idx, week_num)
         
-        conn.commit()
+        if week_keys:
+            # Create 6 days for every week in one statement, then read back
+            # the ids of new and pre-existing days together
+            execute_values(cur, """
+                INSERT INTO days (user_id, week_id, title, order_index)
+                VALUES %s
+                ON CONFLICT (user_id, week_id, order_index) DO NOTHING
+            """, [
+                (user_id, week_id, f"Day {day_num}", day_num)
+                for week_id in week_keys
+                for day_num in range(1, 7)
+            ], page_size=1000)
+            cur.execute("""
+                SELECT id, week_id, order_index FROM days
+                WHERE user_id = %s AND week_id = ANY(%s) AND order_index BETWEEN 1 AND 6
+            """, (user_id, list(week_keys)))
+            for day in cur:
+                phase_idx, week_num = week_keys[day['week_id']]
+                day_map[(phase_idx, week_num, day['order_index'])] = day['id']
         
-        # Backfill resources.day_id
+        # Backfill resources.day_id (same transaction as the structure above)
         orphan_day_id = None
-        cur.execute("""
+        # Server-side cursor so resources stream in batches instead of being
+        # materialized all at once
+        resource_cur = get_db_cursor(conn, name="day_id_backfill")
+        resource_cur.itersize = 1000
+        resource_cur.execute("""
             SELECT id, phase_index, week, day
             FROM resources
             WHERE user_id = %s AND day_id IS NULL
         """, (user_id,))
         
-        resources = cur.fetchall()
         updated_count = 0
         orphan_count = 0
         
-        for resource in resources:
+        # Resolve every resource's day_id in Python, then apply them in one
+        # bulk load instead of one statement per resource
+        assignments = []
+        for resource in resource_cur:
             phase_index = resource['phase_index']
             week = resource['week']
             day = resource['day']
             
+            day_id = None
             if phase_index is not None and week is not None and day is not None:
-                key = (phase_index, week, day)
-                day_id = day_map.get(key)
-                
-                if day_id:
-                    # Update resource with matched day_id
-                    cur.execute("""
-                        UPDATE resources
-                        SET day_id = %s
-                        WHERE id = %s
-                    """, (day_id, resource['id']))
-                    updated_count += 1
-                else:
-                    # Orphan resource - doesn't match YAML structure
-                    if orphan_day_id is None:
-                        orphan_day_id = get_or_create_orphan_inbox(conn, user_id)
-                    
-                    cur.execute("""
-                        UPDATE resources
-                        SET day_id = %s
-                        WHERE id = %s
-                    """, (orphan_day_id, resource['id']))
-                    orphan_count += 1
+                day_id = day_map.get((phase_index, week, day))
+            
+            if day_id:
+                updated_count += 1
             else:
-                # Resource with NULL phase_index/week/day - treat as orphan
+                # Orphan resource - doesn't match YAML structure, or has
+                # NULL phase_index/week/day
                 if orphan_day_id is None:
-                    orphan_day_id = get_or_create_orphan_inbox(conn, user_id)
-                
-                cur.execute("""
-                    UPDATE resources
-                    SET day_id = %s
-                    WHERE id = %s
-                """, (orphan_day_id, resource['id']))
+                    orphan_day_id = get_or_create_orphan_inbox(cur, user_id)
+                day_id = orphan_day_id
                 orphan_count += 1
+            assignments.append((resource['id'], day_id))
+        resource_cur.close()
         
-        conn.commit()
+        if assignments:
+            # Stream the (id, day_id) pairs in over COPY, then apply them with
+            # one set-based UPDATE from the staging table
+            cur.execute("CREATE TEMP TABLE _day_id_stage (id INTEGER, day_id INTEGER)")
+            buf = io.StringIO("".join(f"{rid}\t{did}\n" for rid, did in assignments))
+            cur.copy_from(buf, '_day_id_stage', columns=('id', 'day_id'))
+            cur.execute("""
+                UPDATE resources r
+                SET day_id = s.day_id
+                FROM _day_id_stage s
+                WHERE r.id = s.id
+            """)
+            cur.execute("DROP TABLE _day_id_stage")
+        
+        # Structure and backfill land (or roll back) together
+        cur.execute("RELEASE SAVEPOINT migrate_user")
         print(f"    Updated {updated_count} resources, moved {orphan_count} orphans to inbox")
         
     except Exception as e:
-        conn.rollback()
+        cur.execute("ROLLBACK TO SAVEPOINT migrate_user")
         print(f"    ERROR migrating user {user_id}: {e}")
         raise
     finally:
@@ -277,8 +281,10 @@ def main():
         return 1
     
     try:
-        # Get all users
+        # The whole migration is one transaction, committed once at the end
         cur = get_db_cursor(conn)
+        
+        # Get all users
         cur.execute("SELECT id FROM users ORDER BY id")
         users = cur.fetchall()
         cur.close()
@@ -299,6 +305,7 @@ def main():
                 # Continue with next user
                 continue
         
+        conn.commit()
         print("\nMigration completed!")
         return 0
         
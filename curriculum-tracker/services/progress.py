@@ -4,37 +4,47 @@ Progress service for Curriculum Tracker.
 Handles progress tracking, streaks, time logs, and activity logging.
 """
 
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from flask import g
 from flask_login import current_user
 from database import get_db, get_db_cursor
+from utils import to_date
 
 
-def get_progress(user_id=None):
-    """Get progress data for a user. If user_id is None, uses current_user."""
+def get_progress(user_id=None, for_update=False):
+    """Get progress data for a user. If user_id is None, uses current_user.
+    
+    The row is cached on g for the rest of the request; update_progress()
+    drops the cached copy. for_update=True re-reads the row with a row lock
+    held until the caller's transaction commits (read-modify-write routes).
+    """
     if user_id is None:
         user_id = current_user.id
     
-    conn = get_db()
-    cur = get_db_cursor(conn)
-    cur.execute("SELECT * FROM progress WHERE user_id = %s", (user_id,))
-    row = cur.fetchone()
-    cur.close()
-    
-    if not row:
-        # Initialize if missing
-        today = datetime.now().strftime("%Y-%m-%d")
+    cache = g.setdefault('_progress', {})
+    if for_update or user_id not in cache:
+        conn = get_db()
         cur = get_db_cursor(conn)
-        cur.execute("INSERT INTO progress (user_id, current_phase, current_week, started_at) VALUES (%s, 0, 1, %s)", (user_id, today))
+        lock = " FOR UPDATE" if for_update else ""
+        cur.execute(f"SELECT * FROM progress WHERE user_id = %s{lock}", (user_id,))
+        row = cur.fetchone()
+        
+        if not row:
+            # Initialize if missing
+            today = date.today().isoformat()
+            cur.execute("INSERT INTO progress (user_id, current_phase, current_week, started_at) VALUES (%s, 0, 1, %s) RETURNING *", (user_id, today))
+            row = cur.fetchone()
+            conn.commit()
         cur.close()
-        conn.commit()
-        return get_progress(user_id)
-    
-    return {
-        'current_phase': row['current_phase'] if row['current_phase'] is not None else 0,
-        'current_week': row['current_week'] if row['current_week'] is not None else 1,
-        'started_at': row['started_at'],
-        'last_activity_at': row['last_activity_at']
-    }
+        
+        cache[user_id] = {
+            'current_phase': row['current_phase'] if row['current_phase'] is not None else 0,
+            'current_week': row['current_week'] if row['current_week'] is not None else 1,
+            'started_at': row['started_at'],
+            'last_activity_at': row['last_activity_at']
+        }
+    # Callers get their own copy so the cached dict stays untouched
+    return dict(cache[user_id])
 
 
 def update_progress(user_id=None, **kwargs):
@@ -54,13 +64,44 @@ def update_progress(user_id=None, **kwargs):
     cur.execute(f"UPDATE progress SET {sets}, last_activity_at = %s WHERE user_id = %s", values)
     cur.close()
     conn.commit()
+    g.get('_progress', {}).pop(user_id, None)
+
 
+# Users whose progress row is known to exist in this process
+_initialized_users = set()
 
-def init_if_needed():
-    """Ensure progress table is initialized."""
-    progress = get_progress()
+
+def init_if_needed(user_id=None):
+    """Ensure progress table is initialized (checked once per user per process)."""
+    if user_id is None:
+        user_id = current_user.id
+    
+    if user_id in _initialized_users:
+        return
     # get_progress() auto-initializes if missing
-    return progress
+    get_progress(user_id)
+    _initialized_users.add(user_id)
+
+
+def _get_hours_totals(user_id):
+    """Get all-time hours plus this week's (Mon-Sun) hours and active days in
+    one query, cached for the request."""
+    from utils import get_week_dates
+    week_start, week_end = get_week_dates(date.today().isoformat())
+    cache = g.setdefault('_hours_totals', {})
+    key = (user_id, week_start, week_end)
+    if key not in cache:
+        conn = get_db()
+        cur = get_db_cursor(conn)
+        cur.execute("""
+            SELECT COALESCE(SUM(hours), 0) as total,
+                   COALESCE(SUM(hours) FILTER (WHERE date >= %s AND date <= %s), 0) as week_total,
+                   COUNT(DISTINCT date) FILTER (WHERE date >= %s AND date <= %s) as week_days
+            FROM time_logs WHERE user_id = %s
+        """, (week_start, week_end, week_start, week_end, user_id))
+        cache[key] = cur.fetchone()
+        cur.close()
+    return cache[key]
 
 
 def get_current_week_hours(user_id=None):
@@ -68,15 +109,7 @@ def get_current_week_hours(user_id=None):
     if user_id is None:
         user_id = current_user.id
     
-    from utils import get_week_dates
-    today = datetime.now().strftime("%Y-%m-%d")
-    week_start, week_end = get_week_dates(today)
-    conn = get_db()
-    cur = get_db_cursor(conn)
-    cur.execute("SELECT COALESCE(SUM(hours), 0) as total FROM time_logs WHERE user_id = %s AND date >= %s AND date <= %s", (user_id, week_start, week_end))
-    result = cur.fetchone()
-    cur.close()
-    return result["total"]
+    return _get_hours_totals(user_id)["week_total"]
 
 
 def get_total_hours(user_id=None):
@@ -84,12 +117,8 @@ def get_total_hours(user_id=None):
     if user_id is None:
         user_id = current_user.id
     
-    conn = get_db()
-    cur = get_db_cursor(conn)
-    cur.execute("SELECT COALESCE(SUM(hours), 0) as total FROM time_logs WHERE user_id = %s", (user_id,))
-    result = cur.fetchone()
-    cur.close()
-    return result["total"]
+    # Shares one query with get_current_week_hours() and get_week_activity()
+    return _get_hours_totals(user_id)["total"]
 
 
 def get_hours_for_phase(phase_index, curriculum, user_id=None):
@@ -99,10 +128,25 @@ def get_hours_for_phase(phase_index, curriculum, user_id=None):
     
     conn = get_db()
     cur = get_db_cursor(conn)
-    cur.execute("SELECT COALESCE(SUM(hours), 0) as total FROM time_logs WHERE user_id = %s AND phase_index = %s", (user_id, phase_index))
+    # phase_hours is a trigger-maintained rollup of time_logs
+    cur.execute("SELECT total FROM phase_hours WHERE user_id = %s AND phase_index = %s", (user_id, phase_index))
     result = cur.fetchone()
     cur.close()
-    return result["total"]
+    return result["total"] if result else 0
+
+
+def get_hours_by_phase(user_id=None):
+    """Get total hours logged per phase as {phase_index: hours}."""
+    if user_id is None:
+        user_id = current_user.id
+    
+    conn = get_db()
+    cur = conn.cursor()
+    # Read the trigger-maintained rollup instead of summing time_logs
+    cur.execute("SELECT phase_index, total FROM phase_hours WHERE user_id = %s", (user_id,))
+    results = dict(cur)
+    cur.close()
+    return results
 
 
 def get_hours_for_week(phase_index, week, user_id=None):
@@ -127,7 +171,7 @@ def get_hours_today(user_id=None):
         user_id = current_user.id
     
     conn = get_db()
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = date.today().isoformat()
     cur = get_db_cursor(conn)
     cur.execute("SELECT COALESCE(SUM(hours), 0) as total FROM time_logs WHERE user_id = %s AND date = %s", (user_id, today))
     result = cur.fetchone()
@@ -140,7 +184,7 @@ def get_recent_logs(days=7, user_id=None):
     if user_id is None:
         user_id = current_user.id
     
-    cutoff = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
+    cutoff = (date.today() - timedelta(days=days)).isoformat()
     conn = get_db()
     cur = get_db_cursor(conn)
     cur.execute("SELECT date, hours, notes FROM time_logs WHERE user_id = %s AND date >= %s ORDER BY date DESC", (user_id, cutoff))
@@ -165,8 +209,27 @@ def get_completed_metrics(phase_index=None, user_id=None):
     return results
 
 
-def log_activity(action, entity_type=None, entity_id=None, details=None, user_id=None):
-    """Log an activity to the activity_log table."""
+def get_completed_metric_counts(user_id=None):
+    """Get number of completed metrics per phase as {phase_index: count}."""
+    if user_id is None:
+        user_id = current_user.id
+    
+    conn = get_db()
+    cur = conn.cursor()
+    cur.execute(
+        "SELECT phase_index, COUNT(*) FROM completed_metrics WHERE user_id = %s GROUP BY phase_index",
+        (user_id,)
+    )
+    results = dict(cur)
+    cur.close()
+    return results
+
+
+def log_activity(action, entity_type=None, entity_id=None, details=None, user_id=None, commit=True):
+    """Log an activity to the activity_log table.
+
+    Pass commit=False to record it in the caller's open transaction.
+    """
     if user_id is None:
         user_id = current_user.id
     
@@ -178,7 +241,8 @@ def log_activity(action, entity_type=None, entity_id=None, details=None, user_id
         (action, entity_type, entity_id, details)
     )
     cur.close()
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def get_current_streak(user_id=None):
@@ -195,11 +259,12 @@ def get_current_streak(user_id=None):
     if not dates:
         return 0
     
-    today = datetime.now().date()
+    today = date.today()
     yesterday = today - timedelta(days=1)
     
     # Check if most recent log is today or yesterday
-    most_recent = datetime.strptime(dates[0], "%Y-%m-%d").date()
+    # DATE columns come back as date objects; to_date also accepts strings
+    most_recent = to_date(dates[0])
     if most_recent not in [today, yesterday]:
         return 0  # Streak is broken
     
@@ -207,11 +272,11 @@ def get_current_streak(user_id=None):
     streak = 1
     expected_date = most_recent - timedelta(days=1)
     
-    for date_str in dates[1:]:
-        date = datetime.strptime(date_str, "%Y-%m-%d").date()
-        if date == expected_date:
+    for value in dates[1:]:
+        day = to_date(value)
+        if day == expected_date:
             streak += 1
-            expected_date = date - timedelta(days=1)
+            expected_date = day - timedelta(days=1)
         else:
             break
     
@@ -226,7 +291,7 @@ def get_longest_streak(user_id=None):
     conn = get_db()
     cur = get_db_cursor(conn)
     cur.execute("SELECT DISTINCT date FROM time_logs WHERE user_id = %s ORDER BY date", (user_id,))
-    dates = [datetime.strptime(row["date"], "%Y-%m-%d").date() for row in cur.fetchall()]
+    dates = [to_date(row["date"]) for row in cur]
     cur.close()
     
     if not dates:
@@ -250,20 +315,8 @@ def get_week_activity(user_id=None):
     if user_id is None:
         user_id = current_user.id
     
-    conn = get_db()
-    today = datetime.now()
-    week_start = (today - timedelta(days=today.weekday())).strftime("%Y-%m-%d")
-    week_end = (today + timedelta(days=6 - today.weekday())).strftime("%Y-%m-%d")
-    
-    cur = get_db_cursor(conn)
-    cur.execute(
-        "SELECT COUNT(DISTINCT date) as count FROM time_logs WHERE user_id = %s AND date >= %s AND date <= %s",
-        (user_id, week_start, week_end)
-    )
-    result = cur.fetchone()
-    cur.close()
-    
-    return result["count"] if result else 0
+    # Shares one query with get_current_week_hours() and get_total_hours()
+    return _get_hours_totals(user_id)["week_days"]
 
 
 def get_today_position(start_date):
@@ -271,21 +324,13 @@ def get_today_position(start_date):
     if not start_date:
         return None
     
-    # Handle both string and datetime objects (PostgreSQL returns datetime, SQLite returns string)
-    if isinstance(start_date, datetime):
-        start = start_date
-    elif isinstance(start_date, str):
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-    else:
-        # Try to convert date object to datetime
-        from datetime import date
-        if isinstance(start_date, date):
-            start = datetime.combine(start_date, datetime.min.time())
-        else:
-            return None
+    # Handle both string and date objects (PostgreSQL returns date, settings store a string)
+    try:
+        start = to_date(start_date)
+    except (TypeError, ValueError):
+        return None
     
-    today = datetime.now()
-    days_elapsed = (today - start).days
+    days_elapsed = (date.today() - start).days
     
     # Get actual curriculum structure from database
     # Count total curriculum days and find which one we should be on
@@ -332,7 +377,7 @@ def get_overdue_days(user_id=None):
         user_id = current_user.id
     
     conn = get_db()
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = date.today().isoformat()
     cur = get_db_cursor(conn)
     
     cur.execute("""
@@ -348,5 +393,5 @@ def get_overdue_days(user_id=None):
     overdue = cur.fetchall()
     cur.close()
     
-    return [dict(row) for row in overdue]
+    return overdue
 
@@ -4,9 +4,9 @@ Reporting service for Curriculum Tracker.
 Handles analytics, burndown charts, and time reports.
 """
 
-from datetime import datetime
+from datetime import date
 from database import get_db, get_db_cursor
-from utils import get_start_date
+from utils import get_curriculum_totals, get_start_date, to_date
 
 
 def get_burndown_data():
@@ -24,7 +24,7 @@ def get_burndown_data():
     daily_logs = cur.fetchall()
     cur.close()
     
-    total_hours = 408
+    total_hours = get_curriculum_totals()["total_hours"]
     cumulative = 0
     actual_data = []
     
@@ -87,23 +87,23 @@ def get_time_reports():
     total_days = cur.fetchone()['count']
     daily_avg = total_hours / total_days if total_days > 0 else 0
     
-    # Calculate needed daily average (408 hours total, estimate days remaining)
+    # Calculate needed daily average from the cached curriculum totals
     start_date = get_start_date()
     if start_date:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        today = datetime.now()
-        days_elapsed = (today - start).days
-        days_remaining = 119 - days_elapsed  # 17 weeks * 7 days
-        needed_daily = (408 - total_hours) / days_remaining if days_remaining > 0 else 0
+        totals = get_curriculum_totals()
+        days_elapsed = (date.today() - to_date(start_date)).days
+        days_remaining = totals["total_weeks"] * 7 - days_elapsed
+        needed_daily = (totals["total_hours"] - total_hours) / days_remaining if days_remaining > 0 else 0
     else:
         needed_daily = 0
     
     cur.close()
     
     return {
-        "by_phase": [dict(row) for row in by_phase],
-        "by_type": [dict(row) for row in by_type],
-        "by_week": [dict(row) for row in by_week],
+        # RealDictCursor rows are dicts already; no per-row copies
+        "by_phase": by_phase,
+        "by_type": by_type,
+        "by_week": by_week,
         "daily_avg": daily_avg,
         "needed_daily": needed_daily,
         "total_hours": total_hours
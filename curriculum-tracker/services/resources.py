@@ -4,12 +4,43 @@ Resource service for Curriculum Tracker.
 Handles resource CRUD operations, tagging, and status management.
 """
 
+from flask import g
 from flask_login import current_user
 from database import get_db, get_db_cursor
 
 
+def like_pattern(text):
+    """Build a substring ILIKE pattern, escaping LIKE wildcards in the text."""
+    escaped = text.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+
+def _attach_tags(cur, rows):
+    """Fetch tags for all rows in one query and attach tags/tag_colors lists."""
+    # RealDictCursor rows are already dicts; annotate them in place, no copies
+    resources = rows
+    tags_by_id = {}
+    if resources:
+        cur.execute("""
+            SELECT rt.resource_id, t.name, t.color
+            FROM resource_tags rt
+            JOIN tags t ON t.id = rt.tag_id
+            WHERE rt.resource_id = ANY(%s)
+            ORDER BY rt.resource_id, t.name
+        """, ([r["id"] for r in resources],))
+        for tag in cur:
+            names, colors = tags_by_id.setdefault(tag["resource_id"], ([], []))
+            names.append(tag["name"])
+            colors.append(tag["color"])
+    for item in resources:
+        names, colors = tags_by_id.get(item["id"], ([], []))
+        item["tags"] = names
+        item["tag_colors"] = colors
+    return resources
+
+
 def get_resources(phase_index=None, user_id=None):
-    """Get resources with tags in a single query (fixes N+1 problem).
+    """Get resources with tags in two queries: rows, then one batched tag fetch.
     
     Uses HYBRID query: joins with new FK tables when day_id exists,
     falls back to old phase_index/week/day columns for backward compatibility.
@@ -23,19 +54,14 @@ def get_resources(phase_index=None, user_id=None):
         # HYBRID query: use new FK structure if available, fallback to old columns
         query = """
             SELECT r.*,
-                   STRING_AGG(t.name, '|||') as tag_names,
-                   STRING_AGG(t.color, '|||') as tag_colors,
                    COALESCE(p.title, 'Phase ' || r.phase_index::text) as phase_title,
                    COALESCE(w.title, 'Week ' || r.week::text) as week_title,
                    COALESCE(d.title, 'Day ' || r.day::text) as day_title
             FROM resources r
-            LEFT JOIN resource_tags rt ON r.id = rt.resource_id
-            LEFT JOIN tags t ON rt.tag_id = t.id
             LEFT JOIN days d ON r.day_id = d.id AND d.user_id = r.user_id
             LEFT JOIN weeks w ON d.week_id = w.id AND w.user_id = r.user_id
             LEFT JOIN phases p ON w.phase_id = p.id AND p.user_id = r.user_id
             WHERE r.user_id = %s AND (r.phase_index = %s OR r.phase_index IS NULL)
-            GROUP BY r.id, d.id, w.id, p.id
             ORDER BY COALESCE(w.order_index, r.week), COALESCE(d.order_index, r.day), 
                      r.is_favorite DESC, r.created_at DESC
         """
@@ -44,19 +70,14 @@ def get_resources(phase_index=None, user_id=None):
         # HYBRID query for all resources
         query = """
             SELECT r.*,
-                   STRING_AGG(t.name, '|||') as tag_names,
-                   STRING_AGG(t.color, '|||') as tag_colors,
                    COALESCE(p.title, 'Phase ' || r.phase_index::text) as phase_title,
                    COALESCE(w.title, 'Week ' || r.week::text) as week_title,
                    COALESCE(d.title, 'Day ' || r.day::text) as day_title
             FROM resources r
-            LEFT JOIN resource_tags rt ON r.id = rt.resource_id
-            LEFT JOIN tags t ON rt.tag_id = t.id
             LEFT JOIN days d ON r.day_id = d.id AND d.user_id = r.user_id
             LEFT JOIN weeks w ON d.week_id = w.id AND w.user_id = r.user_id
             LEFT JOIN phases p ON w.phase_id = p.id AND p.user_id = r.user_id
             WHERE r.user_id = %s
-            GROUP BY r.id, d.id, w.id, p.id
             ORDER BY COALESCE(p.order_index, r.phase_index), 
                      COALESCE(w.order_index, r.week), 
                      COALESCE(d.order_index, r.day),
@@ -65,19 +86,8 @@ def get_resources(phase_index=None, user_id=None):
         cur.execute(query, (user_id,))
     
     rows = cur.fetchall()
+    resources = _attach_tags(cur, rows)
     cur.close()
-
-    resources = []
-    for r in rows:
-        item = dict(r)
-        # Parse concatenated tags
-        if r["tag_names"]:
-            item["tags"] = r["tag_names"].split("|||")
-            item["tag_colors"] = r["tag_colors"].split("|||")
-        else:
-            item["tags"] = []
-            item["tag_colors"] = []
-        resources.append(item)
     return resources
 
 
@@ -86,6 +96,65 @@ def get_all_resources():
     return get_resources()
 
 
+def search_resources(search_query=None, resource_type=None, phase_index=None,
+                     tag=None, status=None, user_id=None):
+    """Get resources matching the /resources page filters, filtered in SQL.
+    
+    status is one of 'completed', 'pending' or 'favorites'; anything else
+    leaves status unfiltered.
+    """
+    if user_id is None:
+        user_id = current_user.id
+    
+    where = ["r.user_id = %s"]
+    params = [user_id]
+    if search_query:
+        pattern = like_pattern(search_query)
+        where.append("(r.title ILIKE %s OR r.notes ILIKE %s OR r.topic ILIKE %s)")
+        params += [pattern, pattern, pattern]
+    if resource_type:
+        where.append("r.resource_type = %s")
+        params.append(resource_type)
+    if phase_index is not None:
+        where.append("r.phase_index = %s")
+        params.append(phase_index)
+    if tag:
+        where.append("""EXISTS (
+                SELECT 1 FROM resource_tags rt JOIN tags t ON t.id = rt.tag_id
+                WHERE rt.resource_id = r.id AND t.name = %s)""")
+        params.append(tag)
+    if status == "completed":
+        where.append("r.is_completed")
+    elif status == "pending":
+        where.append("NOT COALESCE(r.is_completed, FALSE)")
+    elif status == "favorites":
+        where.append("r.is_favorite")
+    
+    conn = get_db()
+    cur = get_db_cursor(conn)
+    # Same HYBRID query as get_resources(), with the filters in the WHERE clause
+    query = f"""
+        SELECT r.*,
+               COALESCE(p.title, 'Phase ' || r.phase_index::text) as phase_title,
+               COALESCE(w.title, 'Week ' || r.week::text) as week_title,
+               COALESCE(d.title, 'Day ' || r.day::text) as day_title
+        FROM resources r
+        LEFT JOIN days d ON r.day_id = d.id AND d.user_id = r.user_id
+        LEFT JOIN weeks w ON d.week_id = w.id AND w.user_id = r.user_id
+        LEFT JOIN phases p ON w.phase_id = p.id AND p.user_id = r.user_id
+        WHERE {" AND ".join(where)}
+        ORDER BY COALESCE(p.order_index, r.phase_index), 
+                 COALESCE(w.order_index, r.week), 
+                 COALESCE(d.order_index, r.day),
+                 r.is_favorite DESC, r.created_at DESC
+    """
+    cur.execute(query, params)
+    rows = cur.fetchall()
+    resources = _attach_tags(cur, rows)
+    cur.close()
+    return resources
+
+
 def get_all_tags():
     """Get all tags."""
     conn = get_db()
@@ -96,41 +165,43 @@ def get_all_tags():
     return results
 
 
-def get_resources_by_week(phase_index, week, user_id=None):
-    """Get resources for a specific week with tags in single query (fixes N+1)."""
+def get_resources_by_week(phase_index, week, user_id=None, search_query=None, tag=None):
+    """Get resources for a specific week with tags batched in one extra query (fixes N+1).
+    
+    Optional search_query (title/notes/topic substring) and tag name are
+    applied in SQL so only matching rows are returned.
+    """
     if user_id is None:
         user_id = current_user.id
     
     conn = get_db()
     cur = get_db_cursor(conn)
-    query = """
-        SELECT r.*,
-               STRING_AGG(t.name, '|||') as tag_names,
-               STRING_AGG(t.color, '|||') as tag_colors
+    filters = ""
+    params = [user_id, phase_index, week]
+    if search_query:
+        pattern = like_pattern(search_query)
+        filters += " AND (r.title ILIKE %s OR r.notes ILIKE %s OR r.topic ILIKE %s)"
+        params += [pattern, pattern, pattern]
+    if tag:
+        filters += """ AND EXISTS (
+            SELECT 1 FROM resource_tags rt JOIN tags t ON t.id = rt.tag_id
+            WHERE rt.resource_id = r.id AND t.name = %s)"""
+        params.append(tag)
+    query = f"""
+        SELECT r.*
         FROM resources r
-        LEFT JOIN resource_tags rt ON r.id = rt.resource_id
-        LEFT JOIN tags t ON rt.tag_id = t.id
-        WHERE r.user_id = %s AND r.phase_index = %s AND r.week = %s
-        GROUP BY r.id
+        WHERE r.user_id = %s AND r.phase_index = %s AND r.week = %s{filters}
         ORDER BY r.day, r.sort_order, r.is_favorite DESC, r.created_at DESC
     """
-    cur.execute(query, (user_id, phase_index, week))
+    cur.execute(query, params)
     rows = cur.fetchall()
+    resources = _attach_tags(cur, rows)
     cur.close()
     
     grouped = {i: [] for i in range(1, 7)}
     ungrouped = []
-    for r in rows:
-        item = dict(r)
-        # Parse concatenated tags
-        if r["tag_names"]:
-            item["tags"] = r["tag_names"].split("|||")
-            item["tag_colors"] = r["tag_colors"].split("|||")
-        else:
-            item["tags"] = []
-            item["tag_colors"] = []
-        
-        d = r["day"]
+    for item in resources:
+        d = item["day"]
         if isinstance(d, int) and d in grouped:
             grouped[d].append(item)
         else:
@@ -140,58 +211,64 @@ def get_resources_by_week(phase_index, week, user_id=None):
 
 def get_day_completion(phase_index, week, day, user_id=None):
     """Get completion stats for a specific day. Returns (completed, total)."""
-    if user_id is None:
-        user_id = current_user.id
-    
-    conn = get_db()
-    cur = get_db_cursor(conn)
-    cur.execute(
-        "SELECT COUNT(*) as total, SUM(CASE WHEN is_completed THEN 1 ELSE 0 END) as completed FROM resources WHERE user_id = %s AND phase_index = %s AND week = %s AND day = %s",
-        (user_id, phase_index, week, day)
-    )
-    row = cur.fetchone()
-    cur.close()
-    total = row["total"] or 0
-    completed = row["completed"] or 0
-    return (completed, total)
+    breakdown = get_phase_completion_breakdown(phase_index, user_id)
+    return breakdown["days"].get((week, day), (0, 0))
 
 
 def get_week_completion(phase_index, week, user_id=None):
     """Get completion stats for a specific week. Returns (completed, total, percent)."""
-    if user_id is None:
-        user_id = current_user.id
-    
-    conn = get_db()
-    cur = get_db_cursor(conn)
-    cur.execute(
-        "SELECT COUNT(*) as total, SUM(CASE WHEN is_completed THEN 1 ELSE 0 END) as completed FROM resources WHERE user_id = %s AND phase_index = %s AND week = %s",
-        (user_id, phase_index, week)
-    )
-    row = cur.fetchone()
-    cur.close()
-    total = row["total"] or 0
-    completed = row["completed"] or 0
+    breakdown = get_phase_completion_breakdown(phase_index, user_id)
+    completed, total = breakdown["weeks"].get(week, (0, 0))
     percent = (completed / total * 100) if total > 0 else 0
     return (completed, total, percent)
 
 
 def get_phase_completion(phase_index, user_id=None):
     """Get completion stats for a specific phase. Returns (completed, total, percent)."""
+    completed, total = get_phase_completion_breakdown(phase_index, user_id)["phase"]
+    percent = (completed / total * 100) if total > 0 else 0
+    return (completed, total, percent)
+
+
+def get_phase_completion_breakdown(phase_index, user_id=None):
+    """Get completion stats for a phase, its weeks and its days in one query.
+    
+    Returns {"phase": (completed, total), "weeks": {week: (completed, total)},
+    "days": {(week, day): (completed, total)}}. Cached on g for the request,
+    so the day/week/phase helpers above share this one scan.
+    """
     if user_id is None:
         user_id = current_user.id
     
+    cache = g.setdefault('_completion', {})
+    if (user_id, phase_index) in cache:
+        return cache[(user_id, phase_index)]
+    
     conn = get_db()
     cur = get_db_cursor(conn)
     cur.execute(
-        "SELECT COUNT(*) as total, SUM(CASE WHEN is_completed THEN 1 ELSE 0 END) as completed FROM resources WHERE user_id = %s AND phase_index = %s",
+        "SELECT week, day, COUNT(*) as total, COUNT(*) FILTER (WHERE is_completed) as completed FROM resources WHERE user_id = %s AND phase_index = %s GROUP BY week, day",
         (user_id, phase_index)
     )
-    row = cur.fetchone()
+    rows = cur.fetchall()
     cur.close()
-    total = row["total"] or 0
-    completed = row["completed"] or 0
-    percent = (completed / total * 100) if total > 0 else 0
-    return (completed, total, percent)
+    
+    # Roll the per-day counts up into week and phase totals
+    phase_completed = phase_total = 0
+    weeks = {}
+    days = {}
+    for row in rows:
+        total = row["total"] or 0
+        completed = row["completed"] or 0
+        phase_completed += completed
+        phase_total += total
+        if row["week"] is not None:
+            w_completed, w_total = weeks.get(row["week"], (0, 0))
+            weeks[row["week"]] = (w_completed + completed, w_total + total)
+            if row["day"] is not None:
+                days[(row["week"], row["day"])] = (completed, total)
+    cache[(user_id, phase_index)] = {"phase": (phase_completed, phase_total), "weeks": weeks, "days": days}
+    return cache[(user_id, phase_index)]
 
 
 def get_continue_resource(current_phase, current_week, user_id=None):
@@ -22,11 +22,20 @@ function updateBulkBar() {
     }
 }
 
+// Status actions go through /batch-status (one UPDATE for the selection)
+const BULK_STATUSES = { complete: 'complete', progress: 'in_progress', skip: 'skipped' };
+
 function bulkAction(action) {
     if (selectedResources.size === 0) return;
     
     const form = document.getElementById('bulk-form');
     document.getElementById('bulk-action').value = action;
+    if (action in BULK_STATUSES) {
+        form.action = '/batch-status';
+        document.getElementById('bulk-status').value = BULK_STATUSES[action];
+    } else {
+        form.action = '/bulk';
+    }
     document.getElementById('bulk-ids').value = Array.from(selectedResources).join(',');
     
     if (action === 'delete' && !confirm(`Yeet ${selectedResources.size} resource${selectedResources.size > 1 ? 's' : ''} into the void?`)) {
@@ -60,7 +69,10 @@ document.addEventListener('DOMContentLoaded', function() {
                         new_position: newPosition,
                         day: parseInt(day),
                         week: parseInt(week),
-                        phase: parseInt(phase)
+                        phase: parseInt(phase),
+                        ordered_ids: Array.from(container.children)
+                            .filter(el => el.dataset.resourceId)
+                            .map(el => parseInt(el.dataset.resourceId))
                     })
                 }).catch(err => console.error('Reorder failed:', err));
             }
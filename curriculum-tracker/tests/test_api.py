@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Unit tests for routes/api.py
+Tests JSON endpoints using a mocked database layer.
+"""
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestReorderRoute:
+    """Test drag-and-drop reordering."""
+
+    def test_reorder_moves_resource_once(self, client):
+        """Test the moved resource gets a single row carrying its new position."""
+        with patch('routes.api.get_db') as mock_db, \
+             patch('routes.api.get_db_cursor') as mock_cursor, \
+             patch('routes.api.execute_values') as mock_values:
+
+            mock_cur = MagicMock()
+            mock_cursor.return_value = mock_cur
+            mock_cur.__iter__.return_value = iter([{'id': 1}, {'id': 2}, {'id': 3}])
+
+            response = client.post('/reorder', json={
+                'resource_id': 3, 'new_position': 0, 'day': 1, 'week': 1, 'phase': 0
+            })
+
+            assert response.status_code == 200
+            rows = mock_values.call_args[0][2]
+            moved = [row for row in rows if row[1] == 3]
+            assert moved == [(5, 3, 0, 1, 1)]
+            assert sorted(row[0] for row in rows) == [0, 5, 10]
+
+    def test_reorder_uses_client_order(self, client):
+        """Test a valid ordered_ids list is renumbered without a SELECT."""
+        with patch('routes.api.get_db'), \
+             patch('routes.api.get_db_cursor') as mock_cursor, \
+             patch('routes.api.execute_values') as mock_values:
+
+            mock_cur = MagicMock()
+            mock_cursor.return_value = mock_cur
+
+            response = client.post('/reorder', json={
+                'resource_id': 3, 'new_position': 0, 'day': 1, 'week': 1, 'phase': 0,
+                'ordered_ids': [3, 1, 2]
+            })
+
+            assert response.status_code == 200
+            mock_cur.execute.assert_not_called()
+            rows = mock_values.call_args[0][2]
+            assert sorted((row[1], row[0]) for row in rows) == [(1, 10), (2, 20), (3, 0)]
+
+    @pytest.mark.parametrize('ordered_ids', ['312', [3, '1'], [3, True], {'3': 1}, [1, 2]])
+    def test_reorder_rejects_bad_ordered_ids(self, client, ordered_ids):
+        """Test ordered_ids must be a list of ints that includes the moved resource."""
+        with patch('routes.api.get_db') as mock_db, \
+             patch('routes.api.execute_values') as mock_values:
+
+            response = client.post('/reorder', json={
+                'resource_id': 3, 'new_position': 0, 'day': 1, 'week': 1, 'phase': 0,
+                'ordered_ids': ordered_ids
+            })
+
+            assert response.status_code == 400
+            mock_db.assert_not_called()
+            mock_values.assert_not_called()
+
+
+class TestBatchStatusRoute:
+    """Test setting the status of several resources at once."""
+
+    def test_batch_status_single_update_and_metric_sync(self, app, client):
+        """Test one UPDATE covers every id and milestones complete their metric."""
+        app.config['LOGIN_DISABLED'] = True
+        with patch('routes.api.get_db') as mock_db, \
+             patch('routes.api.get_db_cursor') as mock_cursor, \
+             patch('routes.api.current_user') as mock_user, \
+             patch('routes.api.load_curriculum') as mock_curriculum, \
+             patch('routes.api.log_activity'):
+
+            mock_user.id = 1
+            mock_cur = MagicMock()
+            mock_cursor.return_value = mock_cur
+            mock_cur.fetchall.return_value = [
+                {'id': 1, 'phase_index': 0, 'week': 2, 'is_milestone': True},
+                {'id': 2, 'phase_index': 0, 'week': 1, 'is_milestone': False},
+            ]
+            mock_curriculum.return_value = {'phases': [{'metrics': ['First', 'Second']}]}
+
+            response = client.post('/batch-status', data={'ids': '1,2', 'status': 'complete'})
+
+            assert response.status_code == 302
+            sql_calls = [c[0] for c in mock_cur.execute.call_args_list]
+            updates = [args for args in sql_calls if 'UPDATE resources' in args[0]]
+            assert len(updates) == 1
+            assert updates[0][1][-1] == [1, 2]
+            inserts = [args for args in sql_calls if 'INSERT INTO completed_metrics' in args[0]]
+            assert len(inserts) == 1
+            assert inserts[0][1][2] == 'Second'
+            mock_db.return_value.commit.assert_called_once()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""
+Unit tests for database.py
+Tests connection checkout against a mocked pool.
+"""
+
+import threading
+
+import pytest
+from unittest.mock import patch, MagicMock
+
+
+class TestConnectionCheckout:
+    """Test requests share a bounded set of pooled connections."""
+
+    def test_checkout_waits_for_a_free_slot(self, app):
+        """Test a request past the pool cap waits instead of failing."""
+        import database
+
+        mock_pool = MagicMock()
+        with patch('database.get_pool', return_value=mock_pool), \
+             patch('database._pool_slots', threading.BoundedSemaphore(1)):
+
+            first = app.app_context()
+            first.push()
+            database.get_db()
+
+            checked_out = threading.Event()
+
+            def second_request():
+                with app.app_context():
+                    database.get_db()
+                    checked_out.set()
+                    database.close_db(None)
+
+            worker = threading.Thread(target=second_request)
+            worker.start()
+            assert not checked_out.wait(0.1)
+
+            database.close_db(None)
+            first.pop()
+            worker.join(1)
+            assert checked_out.is_set()
+            assert mock_pool.putconn.call_count == 2
+
+    def test_failed_checkout_frees_its_slot(self, app):
+        """Test a getconn error does not leak a slot."""
+        import database
+
+        mock_pool = MagicMock()
+        mock_pool.getconn.side_effect = RuntimeError("connection refused")
+        slots = threading.BoundedSemaphore(1)
+        with patch('database.get_pool', return_value=mock_pool), \
+             patch('database._pool_slots', slots), \
+             app.app_context():
+
+            with pytest.raises(RuntimeError):
+                database.get_db()
+            assert slots.acquire(blocking=False)
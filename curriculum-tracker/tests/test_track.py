@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Unit tests for track.py
+Tests the SQLite CLI against a temporary database.
+"""
+
+import sqlite3
+
+import pytest
+from click.testing import CliRunner
+
+
+@pytest.fixture
+def track_db(tmp_path, monkeypatch):
+    """Point the CLI at a fresh database under a temporary HOME."""
+    import track
+
+    # Paths are resolved from HOME at import time, so repoint them as well
+    monkeypatch.setenv("HOME", str(tmp_path))
+    app_dir = tmp_path / ".curriculum-tracker"
+    monkeypatch.setattr(track, "APP_DIR", app_dir)
+    monkeypatch.setattr(track, "DB_PATH", app_dir / "progress.db")
+    return track
+
+
+class TestLogCommand:
+    """Test logging hours."""
+
+    def test_log_twice_merges_into_one_row(self, track_db):
+        """Test a second log on the same date adds to the existing row."""
+        runner = CliRunner()
+        first = runner.invoke(track_db.cli, ["log", "0.1", "--date", "2024-01-15"])
+        second = runner.invoke(track_db.cli, ["log", "0.2", "--date", "2024-01-15"])
+
+        assert first.exit_code == 0
+        assert second.exit_code == 0
+        assert "0.10 → 0.30 hours" in second.output
+
+        conn = sqlite3.connect(track_db.DB_PATH)
+        rows = conn.execute("SELECT date, hours FROM time_logs").fetchall()
+        conn.close()
+        assert len(rows) == 1
+        assert rows[0][0] == "2024-01-15"
+        assert rows[0][1] == pytest.approx(0.3)
+
+
+class TestSchemaVersion:
+    """Test the user_version gate on schema setup."""
+
+    def test_fresh_database_is_stamped(self, track_db):
+        """Test a new database gets the schema and the current version."""
+        conn = track_db.get_db()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        indexes = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        conn.close()
+
+        assert version == track_db.SCHEMA_VERSION
+        assert "idx_time_logs_date" in indexes
+
+    def test_current_database_skips_ddl(self, track_db):
+        """Test a database already at the current version is left as is."""
+        track_db.APP_DIR.mkdir(parents=True)
+        conn = sqlite3.connect(track_db.DB_PATH)
+        conn.execute(f"PRAGMA user_version = {track_db.SCHEMA_VERSION}")
+        conn.close()
+
+        conn = track_db.get_db()
+        tables = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")]
+        conn.close()
+
+        assert tables == []
+
+    def test_duplicate_dates_are_merged_before_indexing(self, track_db):
+        """Test an older database with repeated dates upgrades with summed hours."""
+        track_db.APP_DIR.mkdir(parents=True)
+        conn = sqlite3.connect(track_db.DB_PATH)
+        conn.execute("CREATE TABLE time_logs (id INTEGER PRIMARY KEY, date TEXT, hours REAL)")
+        conn.executemany(
+            "INSERT INTO time_logs (date, hours) VALUES (?, ?)",
+            [("2024-01-15", 1.0), ("2024-01-16", 2.0), ("2024-01-15", 0.5), ("2024-01-15", 0.25)],
+        )
+        conn.commit()
+        conn.close()
+
+        conn = track_db.get_db()
+        rows = conn.execute("SELECT id, date, hours FROM time_logs ORDER BY id").fetchall()
+        version = conn.execute("PRAGMA user_version").fetchone()[0]
+        indexes = [row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'index'")]
+        conn.close()
+
+        assert [tuple(row) for row in rows] == [(1, "2024-01-15", 1.75), (2, "2024-01-16", 2.0)]
+        assert version == track_db.SCHEMA_VERSION
+        assert "idx_time_logs_date" in indexes
@@ -57,3 +57,22 @@ class TestDateScheduling:
             recalculate_schedule_from(from_date)
             mock_calc.assert_called_once()
 
+
+
+class TestDateHelpers:
+    """Test date parsing helpers."""
+    
+    def test_to_date_accepts_strings_and_dates(self):
+        """Test to_date normalizes strings, datetimes and dates."""
+        from utils import to_date
+        
+        expected = datetime(2024, 1, 15).date()
+        assert to_date("2024-01-15") == expected
+        assert to_date(datetime(2024, 1, 15, 9, 30)) == expected
+        assert to_date(expected) == expected
+    
+    def test_get_week_dates(self):
+        """Test week bounds run Monday to Sunday."""
+        from utils import get_week_dates
+        
+        assert get_week_dates("2024-01-17") == ("2024-01-15", "2024-01-21")
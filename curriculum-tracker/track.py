@@ -5,9 +5,12 @@ Curriculum Tracker CLI - Track your learning progress through a structured curri
 
 import os
 import sqlite3
-from datetime import datetime, timedelta
+from bisect import bisect_right
+from datetime import date, timedelta
 from pathlib import Path
 from difflib import SequenceMatcher
+from functools import lru_cache
+from itertools import accumulate
 
 import click
 import yaml
@@ -17,9 +20,19 @@ from rich.panel import Panel
 from rich.progress import Progress, BarColumn, TextColumn
 from rich import box
 
+# Prefer the libyaml C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
+
 # === Configuration ===
 APP_DIR = Path.home() / ".curriculum-tracker"
 DB_PATH = APP_DIR / "progress.db"
+# Schema version stamped into PRAGMA user_version by get_db. Any change to
+# get_db's DDL script MUST bump this: databases already at the current
+# version skip the script, so they would never pick the change up.
+SCHEMA_VERSION = 1
 # Look for curriculum.yaml in current dir, then app dir, then package dir
 CURRICULUM_SEARCH_PATHS = [
     Path.cwd() / "curriculum.yaml",
@@ -34,10 +47,23 @@ console = Console()
 def get_db():
     """Get database connection, creating tables if needed."""
     APP_DIR.mkdir(parents=True, exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
+    conn = sqlite3.connect(DB_PATH, cached_statements=256)
     conn.row_factory = sqlite3.Row
     
+    # WAL + relaxed sync: each set_config/log commit skips the rollback-journal fsync
     conn.executescript("""
+        PRAGMA journal_mode=WAL;
+        PRAGMA synchronous=NORMAL;
+        PRAGMA temp_store=MEMORY;
+        PRAGMA cache_size=-20000;
+        PRAGMA mmap_size=134217728;
+    """)
+    
+    # user_version records the schema already applied, so most runs skip the DDL
+    if conn.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+        return conn
+    
+    conn.executescript(f"""
         CREATE TABLE IF NOT EXISTS config (
             key TEXT PRIMARY KEY,
             value TEXT
@@ -53,6 +79,16 @@ def get_db():
             metric_text TEXT,
             completed_date TEXT
         );
+        BEGIN;
+        -- Older databases may hold several rows per date: fold them into the
+        -- lowest id first, or the unique index below cannot be created
+        UPDATE time_logs SET hours = (
+            SELECT SUM(t.hours) FROM time_logs t WHERE t.date = time_logs.date
+        ) WHERE id IN (SELECT MIN(id) FROM time_logs GROUP BY date HAVING COUNT(*) > 1);
+        DELETE FROM time_logs WHERE id NOT IN (SELECT MIN(id) FROM time_logs GROUP BY date);
+        CREATE UNIQUE INDEX IF NOT EXISTS idx_time_logs_date ON time_logs(date);
+        PRAGMA user_version = {SCHEMA_VERSION};
+        COMMIT;
     """)
     conn.commit()
     return conn
@@ -64,19 +100,42 @@ def get_config(conn, key, default=None):
     return row["value"] if row else default
 
 
+@lru_cache(maxsize=8)
+def _config_query(key_count):
+    """Build the get_configs SQL once per key count so sqlite reuses the statement."""
+    placeholders = ",".join("?" * key_count)
+    return f"SELECT key, value FROM config WHERE key IN ({placeholders})"
+
+
+def get_configs(conn, *keys):
+    """Get several config values in one query, as a {key: value} dict."""
+    rows = conn.execute(_config_query(len(keys)), keys)
+    return {row["key"]: row["value"] for row in rows}
+
+
 def set_config(conn, key, value):
     """Set a config value."""
-    conn.execute("INSERT OR REPLACE INTO config (key, value) VALUES (?, ?)", (key, str(value)))
+    conn.execute(
+        "INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        (key, str(value))
+    )
+    conn.commit()
+
+
+def set_configs(conn, values):
+    """Set several config values in one transaction."""
+    conn.executemany(
+        "INSERT INTO config (key, value) VALUES (?, ?) ON CONFLICT(key) DO UPDATE SET value = excluded.value",
+        [(key, str(value)) for key, value in values.items()]
+    )
     conn.commit()
 
 
 def init_if_needed(conn):
     """Initialize config on first run."""
     if get_config(conn, "start_date") is None:
-        today = datetime.now().strftime("%Y-%m-%d")
-        set_config(conn, "start_date", today)
-        set_config(conn, "current_phase", "0")
-        set_config(conn, "current_week", "1")
+        today = date.today().isoformat()
+        set_configs(conn, {"start_date": today, "current_phase": "0", "current_week": "1"})
         console.print("[green]✓ Initialized tracker![/green] Start date set to today.")
 
 
@@ -100,7 +159,7 @@ def load_curriculum():
         raise SystemExit(1)
     
     with open(path) as f:
-        return yaml.safe_load(f), path
+        return yaml.load(f, Loader=YamlLoader), path
 
 
 def save_curriculum(data, path):
@@ -112,10 +171,10 @@ def save_curriculum(data, path):
 # === Helper Functions ===
 def get_week_dates(date_str):
     """Get start and end of the week containing the given date."""
-    date = datetime.strptime(date_str, "%Y-%m-%d")
-    start = date - timedelta(days=date.weekday())
+    day = date.fromisoformat(date_str)
+    start = day - timedelta(days=day.weekday())
     end = start + timedelta(days=6)
-    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    return start.isoformat(), end.isoformat()
 
 
 def fuzzy_match(query, candidates):
@@ -135,35 +194,62 @@ def calculate_total_weeks(curriculum):
     return sum(p["weeks"] for p in curriculum["phases"])
 
 
+def calculate_weeks_prefix(curriculum):
+    """Prefix sums of phase weeks; element i is the weeks before phase i."""
+    return list(accumulate((p["weeks"] for p in curriculum["phases"]), initial=0))
+
+
 def calculate_total_hours(curriculum):
     """Calculate total hours in curriculum."""
     return sum(p["hours"] for p in curriculum["phases"])
 
 
-def get_hours_for_phase(conn, phase_index, curriculum):
+def get_hours_for_phase(conn, phase_index, curriculum, start_date=None, weeks_before=None):
     """Get total hours logged during a phase's weeks."""
     # Calculate which weeks belong to this phase
-    weeks_before = sum(p["weeks"] for p in curriculum["phases"][:phase_index])
+    if weeks_before is None:
+        weeks_before = calculate_weeks_prefix(curriculum)[phase_index]
     phase_weeks = curriculum["phases"][phase_index]["weeks"]
     
-    start_date = get_config(conn, "start_date")
+    if start_date is None:
+        start_date = get_config(conn, "start_date")
     if not start_date:
         return 0
     
-    start = datetime.strptime(start_date, "%Y-%m-%d")
+    start = date.fromisoformat(start_date)
     phase_start = start + timedelta(weeks=weeks_before)
     phase_end = phase_start + timedelta(weeks=phase_weeks)
     
     result = conn.execute(
         "SELECT SUM(hours) as total FROM time_logs WHERE date >= ? AND date < ?",
-        (phase_start.strftime("%Y-%m-%d"), phase_end.strftime("%Y-%m-%d"))
+        (phase_start.isoformat(), phase_end.isoformat())
     ).fetchone()
     return result["total"] or 0
 
 
+def get_hours_by_phase(conn, curriculum, start_date=None):
+    """Get hours logged during each phase's weeks, as a list, in one query."""
+    totals = [0] * len(curriculum["phases"])
+    if start_date is None:
+        start_date = get_config(conn, "start_date")
+    if not start_date:
+        return totals
+    
+    # Phase i spans [bounds[i], bounds[i + 1]); ISO strings sort like dates
+    start = date.fromisoformat(start_date)
+    bounds = [(start + timedelta(weeks=w)).isoformat() for w in calculate_weeks_prefix(curriculum)]
+    rows = conn.execute(
+        "SELECT date, SUM(hours) as total FROM time_logs WHERE date >= ? AND date < ? GROUP BY date",
+        (bounds[0], bounds[-1])
+    )
+    for row in rows:
+        totals[bisect_right(bounds, row["date"]) - 1] += row["total"]
+    return totals
+
+
 def get_current_week_hours(conn):
     """Get hours logged in the current week."""
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = date.today().isoformat()
     week_start, week_end = get_week_dates(today)
     result = conn.execute(
         "SELECT SUM(hours) as total FROM time_logs WHERE date >= ? AND date <= ?",
@@ -194,6 +280,8 @@ def cli(ctx):
     """Curriculum Tracker - Track your learning progress through a structured curriculum."""
     ctx.ensure_object(dict)
     ctx.obj["db"] = get_db()
+    # One connection per invocation, shared by every helper and closed on exit
+    ctx.call_on_close(ctx.obj["db"].close)
     init_if_needed(ctx.obj["db"])
 
 
@@ -332,25 +420,27 @@ def log_hours(ctx, hours, log_date):
     conn = ctx.obj["db"]
     
     if log_date is None:
-        log_date = datetime.now().strftime("%Y-%m-%d")
+        log_date = date.today().isoformat()
     else:
         try:
-            datetime.strptime(log_date, "%Y-%m-%d")
+            log_date = date.fromisoformat(log_date).isoformat()
         except ValueError:
             console.print("[red]Error:[/red] Invalid date format. Use YYYY-MM-DD")
             raise SystemExit(1)
     
-    # Check if entry exists for this date
-    existing = conn.execute("SELECT id, hours FROM time_logs WHERE date = ?", (log_date,)).fetchone()
+    # Insert, or add to the existing entry for this date, in one statement
+    new_total = conn.execute(
+        "INSERT INTO time_logs (date, hours) VALUES (?, ?) "
+        "ON CONFLICT(date) DO UPDATE SET hours = time_logs.hours + excluded.hours "
+        "RETURNING hours",
+        (log_date, hours)
+    ).fetchone()["hours"]
+    conn.commit()
     
-    if existing:
-        new_total = existing["hours"] + hours
-        conn.execute("UPDATE time_logs SET hours = ? WHERE id = ?", (new_total, existing["id"]))
-        conn.commit()
-        console.print(f"[green]✓ Updated {log_date}:[/green] {existing['hours']} → {new_total} hours")
+    if new_total != hours:
+        # The previous total is derived, so round away the float noise
+        console.print(f"[green]✓ Updated {log_date}:[/green] {new_total - hours:.2f} → {new_total:.2f} hours")
     else:
-        conn.execute("INSERT INTO time_logs (date, hours) VALUES (?, ?)", (log_date, hours))
-        conn.commit()
         console.print(f"[green]✓ Logged {hours} hours for {log_date}[/green]")
 
 
@@ -361,8 +451,9 @@ def status(ctx):
     conn = ctx.obj["db"]
     curriculum_data, _ = load_curriculum()
     
-    current_phase = int(get_config(conn, "current_phase", 0))
-    current_week = int(get_config(conn, "current_week", 1))
+    config = get_configs(conn, "current_phase", "current_week", "start_date")
+    current_phase = int(config.get("current_phase", 0))
+    current_week = int(config.get("current_week", 1))
     
     if current_phase >= len(curriculum_data["phases"]):
         console.print("[bold green]🎉 Congratulations! You've completed the curriculum![/bold green]")
@@ -381,8 +472,9 @@ def status(ctx):
     completed_texts = {m["metric_text"] for m in completed}
     
     # Calculate overall progress
-    total_weeks = calculate_total_weeks(curriculum_data)
-    weeks_before = sum(p["weeks"] for p in curriculum_data["phases"][:current_phase])
+    weeks_prefix = calculate_weeks_prefix(curriculum_data)
+    total_weeks = weeks_prefix[-1]
+    weeks_before = weeks_prefix[current_phase]
     current_absolute_week = weeks_before + current_week
     week_progress = (current_absolute_week / total_weeks) * 100
     hour_progress = (total_hours / curriculum_total) * 100 if curriculum_total > 0 else 0
@@ -402,7 +494,7 @@ def status(ctx):
     
     week_status = "🟢" if week_hours >= expected_weekly else "🟡" if week_hours >= expected_weekly * 0.5 else "🔴"
     hours_table.add_row("This week", f"{week_hours:.1f} / {expected_weekly:.1f} hrs {week_status}")
-    hours_table.add_row("Phase total", f"{get_hours_for_phase(conn, current_phase, curriculum_data):.1f} / {phase['hours']} hrs")
+    hours_table.add_row("Phase total", f"{get_hours_for_phase(conn, current_phase, curriculum_data, config.get('start_date'), weeks_before):.1f} / {phase['hours']} hrs")
     hours_table.add_row("Overall", f"{total_hours:.1f} / {curriculum_total} hrs")
     
     console.print(hours_table)
@@ -466,7 +558,7 @@ def mark_done(ctx, metric_text):
         return
     
     # Mark complete
-    today = datetime.now().strftime("%Y-%m-%d")
+    today = date.today().isoformat()
     conn.execute(
         "INSERT INTO completed_metrics (phase_index, metric_text, completed_date) VALUES (?, ?, ?)",
         (current_phase, matched_text, today)
@@ -483,8 +575,9 @@ def next_week(ctx):
     conn = ctx.obj["db"]
     curriculum_data, _ = load_curriculum()
     
-    current_phase = int(get_config(conn, "current_phase", 0))
-    current_week = int(get_config(conn, "current_week", 1))
+    config = get_configs(conn, "current_phase", "current_week")
+    current_phase = int(config.get("current_phase", 0))
+    current_week = int(config.get("current_week", 1))
     
     if current_phase >= len(curriculum_data["phases"]):
         console.print("[bold green]🎉 You've already completed the curriculum![/bold green]")
@@ -499,8 +592,7 @@ def next_week(ctx):
     else:
         # Advance phase
         if current_phase + 1 < len(curriculum_data["phases"]):
-            set_config(conn, "current_phase", current_phase + 1)
-            set_config(conn, "current_week", 1)
+            set_configs(conn, {"current_phase": current_phase + 1, "current_week": 1})
             next_phase = curriculum_data["phases"][current_phase + 1]
             console.print(f"[green]✓ Advanced to {next_phase['name']}![/green]")
         else:
@@ -515,9 +607,10 @@ def summary(ctx):
     conn = ctx.obj["db"]
     curriculum_data, _ = load_curriculum()
     
-    current_phase = int(get_config(conn, "current_phase", 0))
-    current_week = int(get_config(conn, "current_week", 1))
-    start_date = get_config(conn, "start_date")
+    config = get_configs(conn, "current_phase", "current_week", "start_date")
+    current_phase = int(config.get("current_phase", 0))
+    current_week = int(config.get("current_week", 1))
+    start_date = config.get("start_date")
     
     # Phase table
     table = Table(title="📊 Curriculum Summary", box=box.ROUNDED)
@@ -530,9 +623,11 @@ def summary(ctx):
     
     total_expected = 0
     total_logged = 0
+    weeks_prefix = calculate_weeks_prefix(curriculum_data)
+    hours_by_phase = get_hours_by_phase(conn, curriculum_data, start_date)
     
     for i, phase in enumerate(curriculum_data["phases"]):
-        logged = get_hours_for_phase(conn, i, curriculum_data)
+        logged = hours_by_phase[i]
         total_expected += phase["hours"]
         total_logged += logged
         
@@ -567,10 +662,9 @@ def summary(ctx):
     
     # On-track status
     if start_date:
-        start = datetime.strptime(start_date, "%Y-%m-%d")
-        weeks_elapsed = (datetime.now() - start).days // 7 + 1
-        weeks_before = sum(p["weeks"] for p in curriculum_data["phases"][:current_phase])
-        current_absolute_week = weeks_before + current_week
+        start = date.fromisoformat(start_date)
+        weeks_elapsed = (date.today() - start).days // 7 + 1
+        current_absolute_week = weeks_prefix[current_phase] + current_week
         
         console.print()
         if current_absolute_week >= weeks_elapsed:
@@ -6,9 +6,18 @@ Helper functions for dates, file validation, formatting, and curriculum loading.
 
 import os
 import yaml
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
 from pathlib import Path
-from flask import flash
+from flask import flash, g
+from psycopg2.extras import execute_values
+
+# Prefer the libyaml C parser when PyYAML was built with it
+try:
+    from yaml import CSafeLoader as YamlLoader
+except ImportError:
+    from yaml import SafeLoader as YamlLoader
 
 # Path constants
 APP_DIR = Path(__file__).parent
@@ -17,7 +26,7 @@ UPLOAD_FOLDER = APP_DIR / "uploads"
 UPLOAD_FOLDER.mkdir(exist_ok=True)  # Create folder if it doesn't exist
 
 # Allowed file extensions for uploads
-ALLOWED_EXTENSIONS = {
+ALLOWED_EXTENSIONS = frozenset({
     # Images
     'png', 'jpg', 'jpeg', 'gif', 'webp', 'svg', 'bmp', 'ico',
     # Documents
@@ -30,7 +39,7 @@ ALLOWED_EXTENSIONS = {
     'mp4', 'mov', 'avi', 'webm', 'mkv', 'flv', 'wmv', 'm4v', '3gp',
     # Audio
     'mp3', 'wav', 'ogg', 'flac', 'aac', 'm4a', 'wma'
-}
+})
 
 
 def allowed_file(filename):
@@ -38,36 +47,51 @@ def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
 
 
+def to_date(value):
+    """Coerce a YYYY-MM-DD string, datetime or date into a date."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return date.fromisoformat(value)
+
+
+@lru_cache(maxsize=512)
 def get_week_dates(date_str):
     """Get start and end dates of the week containing the given date."""
-    date = datetime.strptime(date_str, "%Y-%m-%d")
-    start = date - timedelta(days=date.weekday())
+    day = to_date(date_str)
+    start = day - timedelta(days=day.weekday())
     end = start + timedelta(days=6)
-    return start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d")
+    return start.isoformat(), end.isoformat()
 
 
 def get_start_date():
-    """Get start date from settings."""
-    from database import get_db, get_db_cursor
-    conn = get_db()
-    cur = get_db_cursor(conn)
-    cur.execute("SELECT value FROM settings WHERE key = 'start_date'")
-    result = cur.fetchone()
-    cur.close()
-    return result['value'] if result else None
+    """Get start date from settings (cached on g for the request)."""
+    if '_start_date' not in g:
+        from database import get_db, get_db_cursor
+        conn = get_db()
+        cur = get_db_cursor(conn)
+        cur.execute("SELECT value FROM settings WHERE key = 'start_date'")
+        result = cur.fetchone()
+        cur.close()
+        g._start_date = result['value'] if result else None
+    return g._start_date
 
 
-def set_start_date(date_str):
+def set_start_date(date_str, commit=True):
     """Set start date in settings."""
     from database import get_db, get_db_cursor
     conn = get_db()
     cur = get_db_cursor(conn)
-    cur.execute("INSERT INTO settings (key, value) VALUES ('start_date', %s) ON CONFLICT (key) DO UPDATE SET value = %s", (date_str, date_str))
+    cur.execute("INSERT INTO settings (key, value) VALUES ('start_date', %s) ON CONFLICT (key) DO UPDATE SET value = EXCLUDED.value", (date_str,))
     cur.close()
-    conn.commit()
+    # Write through so later reads in this request see the new value
+    g._start_date = date_str
+    if commit:
+        conn.commit()
 
 
-def calculate_schedule(start_date):
+def calculate_schedule(start_date, commit=True):
     """Assign scheduled_date to each curriculum day, skipping blocked days."""
     from database import get_db, get_db_cursor
     conn = get_db()
@@ -88,37 +112,40 @@ def calculate_schedule(start_date):
     
     # Get blocked dates
     cur.execute("SELECT date FROM blocked_days")
-    blocked = set(row['date'] for row in cur.fetchall())
+    blocked = {row['date'] for row in cur}
     
-    current_date = datetime.strptime(start_date, "%Y-%m-%d")
+    # Work in date objects throughout: blocked_days.date comes back as a date
+    current_date = to_date(start_date)
     
+    assignments = []
     for row in curriculum_days:
-        phase_idx = row['phase_index']
-        week = row['week']
-        day = row['day']
         # Skip blocked days
-        while current_date.strftime("%Y-%m-%d") in blocked:
+        while current_date in blocked:
             current_date += timedelta(days=1)
         
-        date_str = current_date.strftime("%Y-%m-%d")
-        
-        # Assign this date to all resources on this curriculum day
-        # Set original_date only if it's not already set
-        cur.execute("""
-            UPDATE resources 
-            SET scheduled_date = %s, 
-                original_date = COALESCE(original_date, %s)
-            WHERE phase_index = %s AND week = %s AND day = %s
-        """, (date_str, date_str, phase_idx, week, day))
-        
+        assignments.append((current_date, row['phase_index'], row['week'], row['day']))
         current_date += timedelta(days=1)
     
+    # Assign every curriculum day its date in one statement
+    # Set original_date only if it's not already set
+    execute_values(cur, """
+        UPDATE resources r
+        SET scheduled_date = v.scheduled_date,
+            original_date = COALESCE(r.original_date, v.scheduled_date)
+        FROM (VALUES %s) AS v(scheduled_date, phase_index, week, day)
+        WHERE r.phase_index = v.phase_index AND r.week = v.week AND r.day = v.day
+    """, assignments, template="(%s::date, %s, %s, %s)")
+    
     cur.close()
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
-def recalculate_schedule_from(from_date):
-    """Recalculate scheduled_dates from a specific date forward."""
+def recalculate_schedule_from(from_date, commit=True):
+    """Recalculate scheduled_dates from a specific date forward.
+
+    Pass commit=False to leave the updates in the caller's open transaction.
+    """
     from database import get_db, get_db_cursor
     conn = get_db()
     cur = get_db_cursor(conn)
@@ -152,29 +179,28 @@ def recalculate_schedule_from(from_date):
     
     # Get blocked dates >= from_date
     cur.execute("SELECT date FROM blocked_days WHERE date >= %s", (from_date,))
-    blocked = set(row['date'] for row in cur.fetchall())
+    blocked = {row['date'] for row in cur}
     
-    current_date = datetime.strptime(from_date, "%Y-%m-%d")
+    current_date = to_date(from_date)
     
+    assignments = []
     for row in curriculum_days:
-        phase_idx = row['phase_index']
-        week = row['week']
-        day = row['day']
-        while current_date.strftime("%Y-%m-%d") in blocked:
+        while current_date in blocked:
             current_date += timedelta(days=1)
         
-        date_str = current_date.strftime("%Y-%m-%d")
-        
-        cur.execute("""
-            UPDATE resources 
-            SET scheduled_date = %s
-            WHERE phase_index = %s AND week = %s AND day = %s
-        """, (date_str, phase_idx, week, day))
-        
+        assignments.append((current_date, row['phase_index'], row['week'], row['day']))
         current_date += timedelta(days=1)
     
+    execute_values(cur, """
+        UPDATE resources r
+        SET scheduled_date = v.scheduled_date
+        FROM (VALUES %s) AS v(scheduled_date, phase_index, week, day)
+        WHERE r.phase_index = v.phase_index AND r.week = v.week AND r.day = v.day
+    """, assignments, template="(%s::date, %s, %s, %s)")
+    
     cur.close()
-    conn.commit()
+    if commit:
+        conn.commit()
 
 
 def get_projected_end_date():
@@ -190,11 +216,39 @@ def get_projected_end_date():
     return result['max_date'] if result and result['max_date'] else None
 
 
+def _curriculum_signature():
+    """Stat signature of the curriculum file used as the parse cache key."""
+    # Nanosecond mtime plus size catches rewrites within the same second
+    st = os.stat(CURRICULUM_PATH)
+    return (st.st_mtime_ns, st.st_size)
+
+
+@lru_cache(maxsize=4)
+def _parse_curriculum(signature):
+    """Parse curriculum YAML; cached per (mtime_ns, size) file signature."""
+    with open(CURRICULUM_PATH) as f:
+        return yaml.load(f, Loader=YamlLoader)
+
+
+@lru_cache(maxsize=4)
+def _curriculum_totals(signature):
+    """Week prefix sums and totals for a parsed curriculum signature."""
+    phases = (_parse_curriculum(signature) or {}).get("phases") or []
+    # weeks_prefix[i] is the number of weeks before phase i
+    weeks_prefix = tuple(accumulate((p["weeks"] for p in phases), initial=0))
+    return {
+        "weeks_prefix": weeks_prefix,
+        "total_weeks": weeks_prefix[-1],
+        "total_hours": sum(p["hours"] for p in phases),
+    }
+
+
 def load_curriculum():
     """Load curriculum YAML file with error handling."""
     try:
-        with open(CURRICULUM_PATH) as f:
-            return yaml.safe_load(f)
+        # Editing the file changes its stat signature, which misses the cache.
+        # The parsed dict is shared between calls, so treat it as read-only.
+        return _parse_curriculum(_curriculum_signature())
     except FileNotFoundError:
         flash("Curriculum file not found. Please ensure curriculum.yaml exists.", "error")
         return {"phases": []}
@@ -202,3 +256,11 @@ def load_curriculum():
         flash(f"Error parsing curriculum file: {e}", "error")
         return {"phases": []}
 
+
+def get_curriculum_totals():
+    """Get cached week prefix sums, total weeks and total hours."""
+    try:
+        return _curriculum_totals(_curriculum_signature())
+    except (FileNotFoundError, yaml.YAMLError):
+        # load_curriculum() already reports these to the user
+        return {"weeks_prefix": (0,), "total_weeks": 0, "total_hours": 0}